@@ -1,12 +1,16 @@
-import pandas as pd
+import numpy as np
 import networkx as nx
+from snapshot import load_equipment
 import plotly.graph_objects as go
 from dash import Dash, dcc, html, Input, Output, State, callback_context, ALL
 import dash_bootstrap_components as dbc
+import utils
+import traces
+from utils import explode_parents
 
 # 엑셀 파일에서 데이터 읽기
 file_path = 'pf_example.xlsx'  # 엑셀 파일 경로를 여기에 입력하세요
-df = pd.read_excel(file_path)
+df = load_equipment(file_path)
 
 # 설비의 초기 상태를 모두 on으로 설정
 df['상태'] = 'on'
@@ -14,37 +18,20 @@ df['상태'] = 'on'
 # 그래프 생성 함수
 def create_graph(df):
     G = nx.DiGraph()
-    for index, row in df.iterrows():
-        level = row['레벨']
-        equipment = row['장비 이름']
-        parent_equipments = row['부모 장비']
-        
-        # 노드 추가 시 'level' 속성을 설정
-        G.add_node(equipment, level=level, status=row['상태'])
-        
-        if pd.notna(parent_equipments):
-            for parent_equipment in parent_equipments.split(','):
-                parent_equipment = parent_equipment.strip()
-                G.add_edge(parent_equipment, equipment)
+    # 노드 추가 시 'level' 속성을 설정
+    G.add_nodes_from(
+        (equipment, {'level': level, 'status': status})
+        for equipment, level, status in zip(df['장비 이름'].tolist(), df['레벨'].tolist(), df['상태'].tolist())
+    )
+    edges = explode_parents(df)
+    # 목록에 없는 부모 장비는 레벨이 없는 노드가 되어 배치에 실패하므로 제외
+    edges = edges[edges['parent'].isin(df['장비 이름'])]
+    G.add_edges_from(zip(edges['parent'].tolist(), edges['child'].tolist()))
     return G
 
 # "on" 상태의 설비만 포함된 그래프 생성 함수
 def create_graph_with_status(df):
-    G = nx.DiGraph()
-    for index, row in df[df['상태'] == 'on'].iterrows():
-        level = row['레벨']
-        equipment = row['장비 이름']
-        parent_equipments = row['부모 장비']
-        
-        # 노드 추가 시 'level' 속성을 설정
-        G.add_node(equipment, level=level, status=row['상태'])
-        
-        if pd.notna(parent_equipments):
-            for parent_equipment in parent_equipments.split(','):
-                parent_equipment = parent_equipment.strip()
-                if df[df['장비 이름'] == parent_equipment]['상태'].values[0] == 'on':
-                    G.add_edge(parent_equipment, equipment)
-    return G
+    return utils.create_graph_with_status(df[df['상태'] == 'on'])
 
 # 레벨 기반 레이아웃 생성 함수
 def hierarchy_pos(G, scale=3):
@@ -137,45 +124,13 @@ def update_graph(path_clicks, selected_path_index, toggle_clicks, start_node, en
     G = create_graph(df)
     pos = hierarchy_pos(G, scale=3)
 
-    edge_x = []
-    edge_y = []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.append(x0)
-        edge_x.append(x1)
-        edge_x.append(None)
-        edge_y.append(y0)
-        edge_y.append(y1)
-        edge_y.append(None)
-
-    edge_trace = go.Scatter(
-        x=edge_x, y=edge_y,
-        line=dict(width=2, color='#888'),
-        hoverinfo='none',
-        mode='lines')
-
-    node_x = []
-    node_y = []
-    node_text = []
-    node_color = []
-    for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        node_text.append(node)
-        node_color.append('blue' if df[df['장비 이름'] == node]['상태'].values[0] == 'on' else 'red')
-
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
-        mode='markers+text',
-        hoverinfo='text',
-        text=node_text,
-        marker=dict(
-            showscale=False,
-            color=node_color,
-            size=10,
-            line_width=2))
+    # 좌표 배열과 간선 인덱스 배열로 간선/노드 트레이스를 한 번에 생성
+    nodes = list(G.nodes())
+    pos_array = np.array([pos[node] for node in nodes], dtype=float).reshape(-1, 2)
+    node_index = {node: i for i, node in enumerate(nodes)}
+    webgl = traces.use_webgl(len(nodes))
+    edge_trace = traces.edge_trace(pos_array, traces.edge_index(G.edges(), node_index), webgl=webgl)
+    node_trace = traces.node_trace(pos_array, nodes, [G.nodes[node]['status'] for node in nodes], webgl=webgl)
 
     # y축 레벨 값 설정
     levels = sorted(set(-G.nodes[node]['level'] * 3 for node in G.nodes()))  # scale에 맞춰 y축 값 조정
@@ -227,7 +182,6 @@ def update_graph(path_clicks, selected_path_index, toggle_clicks, start_node, en
     if start_node and end_node:
         try:
             G_with_status = create_graph_with_status(df)
-            pos_with_status = pos
             if start_node not in G_with_status.nodes:
                 path_output = f'Start node {start_node} not found in the graph.'
             elif end_node not in G_with_status.nodes:
@@ -261,25 +215,8 @@ def update_graph(path_clicks, selected_path_index, toggle_clicks, start_node, en
                     path_output = ' -> '.join(sorted_paths[0])
                 elif triggered_id == 'path-dropdown' and selected_path_index is not None:
                     selected_path = sorted_paths[int(selected_path_index)]
-                    path_edges = list(zip(selected_path, selected_path[1:]))
-                    
-                    edge_x = []
-                    edge_y = []
-                    for edge in path_edges:
-                        x0, y0 = pos_with_status[edge[0]]
-                        x1, y1 = pos_with_status[edge[1]]
-                        edge_x.append(x0)
-                        edge_x.append(x1)
-                        edge_x.append(None)
-                        edge_y.append(y0)
-                        edge_y.append(y1)
-                        edge_y.append(None)
-
-                    path_trace = go.Scatter(
-                        x=edge_x, y=edge_y,
-                        line=dict(width=4, color='green'),
-                        hoverinfo='none',
-                        mode='lines')
+                    path_edges = traces.edge_index(zip(selected_path, selected_path[1:]), node_index)
+                    path_trace = traces.edge_trace(pos_array, path_edges, width=4, color='green', webgl=webgl)
                     path_traces.append(path_trace)
 
                 fig.add_traces(path_traces)
@@ -326,4 +263,4 @@ def display_selected_path_info(n_clicks, selected_path_index, start_node, end_no
     return "경로가 선택되지 않았습니다."
 
 if __name__ == '__main__':
-    app.run_server(debug=True, host='0.0.0.0', port=8050)
+    app.run(debug=True, host='0.0.0.0', port=8050)
@@ -1,12 +1,40 @@
 from dash import Dash
 import dash_bootstrap_components as dbc
 from layout import create_layout
-from callbacks import register_callbacks
+import callbacks
+from background import create_manager
+import profiling
+import render
 
 # Dash 애플리케이션 생성
-app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
-app.layout = create_layout(app)
-register_callbacks(app)
+#   excel_path: 장비 목록 경로 (없으면 callbacks의 기본 경로)
+#   preload: True면 시작 직후 별도 스레드에서 장비 목록을 불러옴 (False면 첫 요청에서 불러옴)
+#   watch: True면 장비 목록 파일이 바뀔 때 다시 읽어 교체 (주기는 PF_RELOAD_INTERVAL, 0이면 끔)
+# 장비 목록과 pandas/networkx 등 무거운 모듈은 여기서 읽지 않으므로 작업자가 바로 요청을 받을 수 있음
+def create_app(excel_path=None, preload=False, watch=True):
+    if excel_path:
+        callbacks.configure(excel_path)
+    # 경로 탐색/정지 분석은 별도 프로세스에서 실행 (웹 작업자는 다른 요청을 계속 처리)
+    manager = create_manager()
+    app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], background_callback_manager=manager)
+    # 페이지를 열 때마다 레이아웃을 새로 만들어 세션 id를 발급
+    app.layout = lambda: create_layout(app)
+    callbacks.register_callbacks(app, manager)
+    # 콜백 단계별 시간 지표(/metrics)와 프로파일 조회(/debug/profile, 페이지 주소에 ?profile=1)
+    # 인증이 없으므로 PF_PROFILE=1일 때만 등록
+    profiling.install(app.server)
+    # 계층 그림 이미지(/render.png, /render.svg?session=&path=), 토폴로지 버전/상태/경로별로 캐시
+    render.install(app.server, callbacks.current, callbacks.status_store.overrides)
+    if preload:
+        callbacks.preload()
+    if watch:
+        callbacks.watch()
+    return app
+
+app = create_app()
+# WSGI 서버용 (예: gunicorn app:server)
+server = app.server
 
 if __name__ == '__main__':
-    app.run_server(debug=True, host='0.0.0.0', port=8050)
+    callbacks.preload()
+    app.run(debug=True, host='0.0.0.0', port=8050)
@@ -0,0 +1,43 @@
+import functools
+import os
+
+from dash import DiskcacheManager
+
+# 백그라운드 작업(경로 탐색, 정지 분석)의 진행 상황과 결과를 저장하는 diskcache 디렉터리
+JOB_CACHE_DIR = os.environ.get('PF_JOB_CACHE', 'pf_jobs')
+
+# 작업을 별도 프로세스에서 실행하는 diskcache 관리자
+# diskcache/multiprocess/psutil이 없으면 None (작업을 요청 처리 스레드에서 바로 실행)
+def create_manager(path=JOB_CACHE_DIR):
+    try:
+        import diskcache
+        return DiskcacheManager(diskcache.Cache(path))
+    except ImportError:
+        print('백그라운드 작업 관리자 없음: pip install "dash[diskcache]" 후 다시 실행하세요')
+        return None
+
+# 경로 탐색 결과를 웹 프로세스와 백그라운드 작업 프로세스가 함께 쓰는 diskcache (최대 크기, 바이트)
+PATH_CACHE_LIMIT = 64 * 2 ** 20
+
+# 작업 관리자와 같은 디렉터리 아래의 경로 캐시 (diskcache가 없으면 None -> 작업도 같은 프로세스에서 실행되므로 불필요)
+# 장비 목록을 다시 읽을 때마다 새로 열지 않도록 경로별로 하나만 열어 둠 (키에 토폴로지 버전이 들어 있어 재사용 가능)
+@functools.lru_cache(maxsize=None)
+def shared_path_cache(path=JOB_CACHE_DIR):
+    try:
+        import diskcache
+    except ImportError:
+        return None
+    return diskcache.Cache(os.path.join(path, 'paths'), size_limit=PATH_CACHE_LIMIT)
+
+# 관리자가 있으면 백그라운드 콜백(진행 상황/취소 지원), 없으면 일반 콜백으로 등록
+# 콜백 함수는 첫 번째 인자로 set_progress를 받음 (일반 콜백일 때는 아무것도 하지 않는 함수)
+def background_callback(app, manager, *args, progress=None, running=None, cancel=None, **kwargs):
+    def decorator(func):
+        if manager is None:
+            @functools.wraps(func)
+            def run(*values):
+                return func(lambda *progress_values: None, *values)
+            return app.callback(*args, running=running, **kwargs)(run)
+        return app.callback(*args, background=True, manager=manager, progress=progress,
+                            running=running, cancel=cancel, **kwargs)(func)
+    return decorator
@@ -0,0 +1,242 @@
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from snapshot import load_equipment
+from topology import Topology
+from routing import RouteModel, iter_shortest_routes, parse_nodes, sort_costs
+from scenario import parse_overrides
+
+# 작업 파일 열 이름 (한글/영문 모두 허용): 시작 장비, 끝 장비, 반드시 지날 장비, 지나면 안 되는 장비
+JOB_COLUMNS = {'시작': 'start', '끝': 'end', '필터': 'filter', '제외': 'avoid'}
+# 작업마다 내보낼 최대 경로 수 기본값
+DEFAULT_K = 1
+# Parquet 출력 시 한 번에 쓰는 행 수
+PARQUET_BATCH = 10000
+
+_worker = {}
+
+# on 장비 사이의 자식 목록 (RouteModel.iter_routes가 쓰는 successors/in만 제공, 그래프 뷰보다 빠름)
+class Adjacency(dict):
+    def successors(self, node):
+        return self[node]
+
+# CSV/Parquet 작업 파일을 (start, end, filter, avoid) 열의 DataFrame으로 읽음
+def load_jobs(path):
+    if path.endswith('.parquet'):
+        jobs = pd.read_parquet(path)
+    else:
+        jobs = pd.read_csv(path, dtype=str, keep_default_na=False, skipinitialspace=True)
+    jobs = jobs.rename(columns=lambda column: JOB_COLUMNS.get(str(column).strip(), str(column).strip()))
+    missing = [column for column in ('start', 'end') if column not in jobs.columns]
+    if missing:
+        raise ValueError(f"작업 파일에 필수 열이 없습니다: {', '.join(missing)}")
+    for column in ('filter', 'avoid'):
+        if column not in jobs.columns:
+            jobs[column] = ''
+    jobs = jobs[['start', 'end', 'filter', 'avoid']].fillna('').astype(str)
+    return jobs.apply(lambda column: column.str.strip())
+
+# 시작 장비 하나에서 레벨 단위로 넓혀 가는 BFS (같은 시작 장비의 모든 작업이 탐색 결과를 공유)
+# 끝 장비가 모두 발견된 레벨에서 멈추고, 장비마다 최단 거리의 직전 장비 목록을 반환
+def bfs_predecessors(adjacency, start, targets):
+    if start not in adjacency:
+        return {}
+    preds = {start: []}
+    remaining = set(targets) - {start}
+    frontier = [start]
+    depth = 0
+    while frontier and remaining:
+        depth += 1
+        found = []
+        dist = {}
+        for node in frontier:
+            for child in adjacency[node]:
+                if child not in preds:
+                    preds[child] = [node]
+                    dist[child] = depth
+                    found.append(child)
+                elif dist.get(child) == depth:
+                    preds[child].append(node)
+        remaining.difference_update(found)
+        frontier = found
+    return preds
+
+# 직전 장비 목록을 끝 장비에서 거슬러 올라가 최단 경로를 최대 k개 생성
+def shortest_paths(preds, start, end, k):
+    if end not in preds:
+        return []
+    paths = []
+    # (현재 장비, 현재 장비부터 끝 장비까지의 연결 목록)
+    stack = [(end, (end, None))]
+    while stack and len(paths) < k:
+        node, link = stack.pop()
+        if node == start:
+            path = []
+            while link is not None:
+                path.append(link[0])
+                link = link[1]
+            paths.append(path)
+            continue
+        for parent in reversed(preds[node]):
+            stack.append((parent, (parent, link)))
+    return paths
+
+def _init_worker(context):
+    _worker.update(context)
+
+def _run_group(task):
+    return run_group(*task, **_worker)
+
+# 같은 시작 장비의 작업 묶음 실행 (모든 작업이 장비 수 기준 최단 경로, cost는 장비 비용 모델의 경로 비용)
+#   조건 없는 작업: 공유 BFS에서 최단 경로
+#   포함/제외 조건이 있는 작업: 화면의 조건 검색(단거리 우선)과 같은 장비 수 비용 A*를 최단 길이까지만
+def run_group(start, items, adjacency, base, model, hop_model, k):
+    plain = [end for _, end, include, avoid in items if not include and not avoid]
+    preds = bfs_predecessors(adjacency, start, plain) if plain else {}
+    records = []
+    for job, end, include, avoid in items:
+        record = {'job': job, 'start': start, 'end': end, 'filter': include, 'avoid': avoid}
+        if start not in adjacency or end not in adjacency:
+            missing = start if start not in adjacency else end
+            reason = '없는 장비' if missing not in base else 'off 상태 장비'
+            records.append({**record, 'found': False, 'hops': None, 'cost': None, 'paths': [],
+                            'error': f'{reason}: {missing}'})
+            continue
+        if not include and not avoid:
+            paths = shortest_paths(preds, start, end, k)
+        else:
+            paths = [path for _, path in iter_shortest_routes(hop_model, adjacency, start, end, k,
+                                                              parse_nodes(include), parse_nodes(avoid))]
+        costs = [model.path_cost(path) for path in paths]
+        records.append({**record, 'found': bool(paths), 'hops': len(paths[0]) - 1 if paths else None,
+                        'cost': costs[0] if costs else None, 'paths': paths, 'error': None})
+    return records
+
+# 장비 목록을 한 번만 읽어 두고 여러 경로 작업을 처리하는 배치 실행기 (그림 관련 모듈을 쓰지 않음)
+#   overrides: 장비 목록의 상태 위에 얹을 상태 변경분, k: 작업마다 내보낼 최대 경로 수
+class BatchRunner:
+    def __init__(self, topology, overrides=None, k=DEFAULT_K, model=None):
+        view = topology.view(overrides or {})
+        base = topology.base
+        off = frozenset(view.off)
+        # on 장비 사이의 자식 목록 (BFS용)
+        adjacency = Adjacency((node, [child for child in base.successors(node) if child not in off])
+                              for node in base if node not in off)
+        self.context = dict(adjacency=adjacency, base=base, model=model or RouteModel(topology),
+                            hop_model=RouteModel(topology, sort_costs(topology, 'shortest')), k=k)
+
+    # 조건 없는 작업은 시작 장비별로 묶어 실행하고 끝나는 묶음부터 결과를 내보냄 (작업 번호는 'job')
+    # workers=1이면 현재 프로세스에서, 아니면 프로세스 풀로 병렬 실행
+    def run(self, jobs, workers=None):
+        groups = defaultdict(list)
+        tasks = []
+        for job, (start, end, include, avoid) in enumerate(jobs[['start', 'end', 'filter', 'avoid']].itertuples(index=False)):
+            if include or avoid:
+                # 조건이 있는 작업은 BFS를 공유하지 않으므로 작업마다 따로 나눠 실행
+                tasks.append((start, [(job, end, include, avoid)]))
+            else:
+                groups[start].append((job, end, include, avoid))
+        tasks += list(groups.items())
+        if workers == 1 or len(tasks) <= 1:
+            for start, items in tasks:
+                yield from run_group(start, items, **self.context)
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.context,)) as pool:
+            for future in as_completed([pool.submit(_run_group, task) for task in tasks]):
+                yield from future.result()
+
+# JSON Lines 출력 ('-'이면 표준 출력)
+class JsonlWriter:
+    def __init__(self, path):
+        self.file = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8')
+
+    def write(self, records):
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+# Parquet 출력: PARQUET_BATCH 행씩 행 그룹으로 기록 (pyarrow 필요)
+class ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError('Parquet 출력에는 pyarrow가 필요합니다: pip install pyarrow') from None
+        self.pa = pa
+        self.schema = pa.schema([('job', pa.int64()), ('start', pa.string()), ('end', pa.string()),
+                                 ('filter', pa.string()), ('avoid', pa.string()), ('found', pa.bool_()),
+                                 ('hops', pa.int64()), ('cost', pa.float64()),
+                                 ('paths', pa.list_(pa.list_(pa.string()))), ('error', pa.string())])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.buffer = []
+
+    def write(self, records):
+        self.buffer.extend(records)
+        if len(self.buffer) >= PARQUET_BATCH:
+            self._flush()
+
+    def _flush(self):
+        if self.buffer:
+            self.writer.write_table(self.pa.Table.from_pylist(self.buffer, schema=self.schema))
+            self.buffer = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+def open_writer(path):
+    return ParquetWriter(path) if path.endswith('.parquet') else JsonlWriter(path)
+
+# 장비 목록과 작업 파일을 읽어 결과를 output에 스트리밍으로 기록, (작업 수, 경로를 찾은 작업 수) 반환
+def run_batch(excel_path, jobs_path, output, overrides=None, k=DEFAULT_K, workers=None, progress=None):
+    df, edges = load_equipment(excel_path, edges=True)
+    topology = Topology(df, edges=edges)
+    runner = BatchRunner(topology, overrides, k)
+    jobs = load_jobs(jobs_path)
+    writer = open_writer(output)
+    done = found = 0
+    try:
+        buffer = []
+        for record in runner.run(jobs, workers):
+            buffer.append(record)
+            done += 1
+            found += record['found']
+            if len(buffer) >= 1000:
+                writer.write(buffer)
+                buffer = []
+                if progress is not None:
+                    progress(done, len(jobs))
+        writer.write(buffer)
+    finally:
+        writer.close()
+    return done, found
+
+def main():
+    parser = argparse.ArgumentParser(description='여러 (시작, 끝) 장비 쌍의 경로를 화면 없이 일괄 탐색')
+    parser.add_argument('excel_path')
+    parser.add_argument('jobs', help="작업 CSV/Parquet (열: start/시작, end/끝, 선택: filter/필터, avoid/제외)")
+    parser.add_argument('-o', '--output', default='-', help="결과 경로 (.jsonl 또는 .parquet, '-'이면 표준 출력)")
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help='작업마다 내보낼 최대 경로 수')
+    parser.add_argument('--status', default='', help="장비 상태 변경 (예: 'Sub1,Sub3' 끄기, 'Sub2=on' 켜기)")
+    parser.add_argument('--workers', type=int, help='프로세스 수 (기본값: CPU 수)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    progress = lambda done, total: print(f'{done} / {total}', file=sys.stderr)
+    done, found = run_batch(args.excel_path, args.jobs, args.output, parse_overrides(args.status),
+                            args.k, args.workers, progress)
+    print(f'작업 {done}개, 경로 발견 {found}개, {time.perf_counter() - started:.1f}초', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
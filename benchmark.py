@@ -0,0 +1,328 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+import plotly.graph_objects as go
+
+from utils import create_graph_with_status
+from csr import CSRTopology
+from topology import Topology
+from positions import LayoutCache
+from paths import search_paths
+from synthetic import generate_plant
+import traces
+
+# 기존 iterrows 기반 그래프 생성 (비교 및 결과 검증용)
+def legacy_create_graph_with_status(df):
+    G = nx.DiGraph()
+    for index, row in df.iterrows():
+        G.add_node(row['장비 이름'], level=row['레벨'], status=row['상태'])
+        if pd.notna(row['부모 장비']):
+            for parent_equipment in row['부모 장비'].split(','):
+                parent_equipment = parent_equipment.strip()
+                if not df[df['장비 이름'] == parent_equipment].empty:
+                    if df[df['장비 이름'] == parent_equipment]['상태'].values[0] == 'on':
+                        G.add_edge(parent_equipment, row['장비 이름'])
+    return G
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def measure_memory(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+# networkx DiGraph와 CSR 저장소의 생성 시간/메모리, 최단 경로 탐색 시간 비교
+def compare_backends(rows, queries=20):
+    df = generate_plant(rows)
+    G, graph_time, graph_peak = measure_memory(create_graph_with_status, df)
+    store, store_time, store_peak = measure_memory(CSRTopology.from_dataframe, df)
+
+    rng = random.Random(0)
+    roots = [n for n, level in G.nodes(data='level') if level == 1]
+    leaves = [n for n in G if G.out_degree(n) == 0]
+    pairs = [(rng.choice(roots), rng.choice(leaves)) for _ in range(queries)]
+
+    def run(search):
+        count = 0
+        for start, end in pairs:
+            try:
+                count += sum(1 for _ in search(start, end))
+            except nx.NetworkXNoPath:
+                pass
+        return count
+
+    graph_paths, graph_search = measure(run, lambda s, t: nx.all_shortest_paths(G, s, t))
+    store_paths, store_search = measure(run, store.all_shortest_paths)
+    assert graph_paths == store_paths, 'CSR 저장소의 경로 수가 다릅니다'
+    print(f'{rows:>8} networkx build {graph_time:.3f}s peak {graph_peak / 1e6:.1f}MB search {graph_search:.3f}s'
+          f' | csr build {store_time:.3f}s peak {store_peak / 1e6:.1f}MB'
+          f' arrays {store.nbytes() / 1e6:.1f}MB search {store_search:.3f}s')
+
+# 그래프 화면 갱신 단계별 측정 (그래프 생성 -> 토폴로지 -> 배치 -> 경로 탐색 -> 그림 생성/직렬화)
+STAGES = ['build', 'topology', 'layout', 'multipartite', 'paths', 'figure', 'serialize']
+# 이 시간(초)보다 짧은 차이는 측정 잡음으로 보고 회귀로 판정하지 않음
+NOISE_FLOOR = 0.05
+
+def _stage_functions(df, queries, multipartite_max):
+    state = {}
+
+    def build():
+        return create_graph_with_status(df)
+
+    def topology():
+        state['topology'] = Topology(df)
+        # 앱과 같이 장비 목록의 상태를 얹은 읽기 전용 뷰로 배치/탐색
+        state['view'] = state['topology'].view({})
+
+    def layout():
+        cache = LayoutCache()
+        cache.layout(state['view'].graph)
+        state['layout'] = cache
+
+    def multipartite():
+        if len(df) <= multipartite_max:
+            nx.multipartite_layout(state['view'].graph, subset_key='level')
+
+    def paths():
+        topo = state['topology']
+        rng = random.Random(0)
+        roots = topo.by_level[:max(1, int(np.searchsorted(topo.table_levels, 1, 'right')))]
+        leaves = [node for node in topo.by_level[-1000:] if topo.base.out_degree(node) == 0] or topo.by_level[-1:]
+        for _ in range(queries):
+            try:
+                search_paths(state['view'].active, rng.choice(roots), rng.choice(leaves), sort='priority', score=topo.score_path)
+            except nx.NetworkXNoPath:
+                pass
+
+    def figure():
+        topo, cache = state['topology'], state['layout']
+        webgl = traces.use_webgl(len(cache.nodes))
+        hidden = [parent in state['view'].off for parent, child in topo.edges]
+        state['figure'] = go.Figure(data=[
+            traces.edge_trace(cache.array, traces.edge_index(topo.edges, cache.index), webgl=webgl, hidden=hidden, patchable=True),
+            traces.node_trace(cache.array, cache.nodes, [state['view'].status(node) for node in cache.nodes], webgl=webgl),
+        ])
+
+    def serialize():
+        state['figure'].to_json()
+
+    return [(name, func) for name, func in zip(STAGES, [build, topology, layout, multipartite, paths, figure, serialize])]
+
+# 단계별 실행 시간(추적 없이)과 최대 메모리(tracemalloc 추적 실행)를 측정
+def run_stages(rows, queries=20, multipartite_max=100000, memory=True, **plant):
+    df = generate_plant(rows, **plant)
+    results = {}
+    for name, func in _stage_functions(df, queries, multipartite_max):
+        _, seconds = measure(func)
+        results[name] = {'seconds': seconds}
+    if memory:
+        for name, func in _stage_functions(df, queries, multipartite_max):
+            _, _, peak = measure_memory(func)
+            results[name]['peak_mb'] = peak / 1e6
+    return results
+
+# 기준 결과보다 threshold배 이상 느려지거나 메모리를 더 쓴 단계 목록
+def find_regressions(results, baseline, threshold):
+    regressions = []
+    for rows, stages in results.items():
+        for name, current in stages.items():
+            previous = baseline.get(rows, {}).get(name)
+            if previous is None:
+                continue
+            if current['seconds'] > previous['seconds'] * threshold and current['seconds'] - previous['seconds'] > NOISE_FLOOR:
+                regressions.append(f"{rows}행 {name}: {previous['seconds']:.3f}s -> {current['seconds']:.3f}s")
+            if 'peak_mb' in current and 'peak_mb' in previous and current['peak_mb'] > previous['peak_mb'] * threshold \
+                    and current['peak_mb'] - previous['peak_mb'] > 1:
+                regressions.append(f"{rows}행 {name}: {previous['peak_mb']:.1f}MB -> {current['peak_mb']:.1f}MB")
+    return regressions
+
+def stage_suite(args):
+    # 첫 호출에만 드는 비용(plotly 검증기 로딩 등)이 첫 크기의 결과에 섞이지 않도록 미리 한 번 실행
+    run_stages(100, queries=1, memory=False)
+    results = {}
+    print(f"{'rows':>8} " + ' '.join(f'{name:>12}' for name in STAGES))
+    for rows in args.rows:
+        stages = run_stages(rows, args.queries, args.multipartite_max, not args.no_memory,
+                            levels=args.levels, fan_out=args.fan_out, redundancy=args.redundancy,
+                            primary_ratio=args.primary_ratio)
+        results[str(rows)] = stages
+        print(f'{rows:>8} ' + ' '.join(f"{stages[name]['seconds']:>11.3f}s" for name in STAGES))
+        if not args.no_memory:
+            print(f"{'':>8} " + ' '.join(f"{stages[name]['peak_mb']:>10.1f}MB" for name in STAGES))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for line in regressions:
+            print('회귀: ' + line)
+        if regressions:
+            sys.exit(1)
+
+# 정지 분석 검증의 기본 설비 크기 (N-2 전수 계산은 후보 수의 제곱에 비례)
+CONTINGENCY_ROWS = [200, 400]
+
+# 정지 분석(N-1/N-2) 결과를 장비를 직접 빼 보는 전수 계산과 비교 (작은 가상 설비)
+# 반환: 어긋난 항목 목록 (비어 있으면 일치)
+def check_contingency(rows, off_ratio=0.02, seed=0, **plant):
+    from contingency import SUPPLY, supply_graph, criticality_report
+
+    topology = Topology(generate_plant(rows, seed=seed, **plant))
+    # 공급원이 꺼져 전체가 정전되지 않도록 최상위 아래의 장비만 끔
+    inner = [node for node in topology.base if topology.base.in_degree(node) > 0]
+    off = random.Random(seed).sample(inner, int(len(inner) * off_ratio))
+    view = topology.view({node: 'off' for node in off})
+    G, loads = supply_graph(view)
+    fed = loads & nx.descendants(G, SUPPLY)
+
+    def lost(removed):
+        return fed - set(removed) - nx.descendants(nx.restricted_view(G, removed, []), SUPPLY)
+
+    report, pair_report = criticality_report(view, pairs=True, workers=1)
+    mismatches = []
+    single = {}
+    for node, count in zip(report['장비 이름'], report['차단 부하 수']):
+        single[node] = lost([node])
+        if len(single[node]) != count:
+            mismatches.append(f'N-1 {node}: {count} != {len(single[node])}')
+
+    # 두 장비를 함께 뺐을 때 각각의 단일 정지 결과를 합친 것보다 더 많이 차단되는 조합
+    candidates = [node for node in report['장비 이름'] if node not in loads]
+    expected = {}
+    for i, first in enumerate(candidates):
+        for second in candidates[i + 1:]:
+            both, alone = len(lost([first, second])), len(single[first] | single[second])
+            if both > alone:
+                expected[frozenset((first, second))] = (both, both - alone)
+    found = {frozenset((first, second)): (lost_count, extra) for first, second, lost_count, extra
+             in pair_report[['장비 1', '장비 2', '차단 부하 수', '추가 차단 부하 수']].itertuples(index=False)}
+    for pair in expected.keys() | found.keys():
+        if expected.get(pair) != found.get(pair):
+            mismatches.append(f"N-2 {' + '.join(sorted(pair))}: {found.get(pair)} != {expected.get(pair)}")
+    print(f'{rows:>8}행: 장비 {len(report)}개, 조합 후보 {len(candidates)}개, '
+          f'추가 차단 조합 {len(expected)}개, 불일치 {len(mismatches)}건')
+    return mismatches
+
+def contingency_suite(args):
+    mismatches = []
+    for rows in args.rows or CONTINGENCY_ROWS:
+        mismatches += check_contingency(rows, levels=args.levels, fan_out=args.fan_out,
+                                        redundancy=args.redundancy, primary_ratio=args.primary_ratio)
+    for line in mismatches[:20]:
+        print('불일치: ' + line)
+    if mismatches:
+        sys.exit(1)
+
+# 작업자 시작 시 모듈 불러오기 시간 예산(초): python -X importtime의 최상위 모듈 누적 시간 합
+IMPORT_BUDGET = 0.9
+
+# 새 인터프리터에서 module을 불러오는 시간 측정 (repeat번 중 가장 빠른 결과)
+# 반환: (불러오기 시간 합, 프로세스 전체 시간, [(누적 시간, 모듈 이름)] 누적 시간 순, 깊이 2까지)
+def import_times(module='app', repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        total, modules = 0.0, []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            depth = (len(name) - len(name.lstrip()) - 1) // 2 + 1
+            seconds = int(cumulative) / 1e6
+            if depth == 1:
+                total += seconds
+            if depth <= 2:
+                modules.append((seconds, name.strip()))
+        if best is None or total < best[0]:
+            best = (total, wall, sorted(modules, reverse=True))
+    return best
+
+def import_suite(args):
+    total, wall, modules = import_times(args.import_module)
+    for seconds, name in modules[:15]:
+        print(f'{seconds:>8.3f}s {name}')
+    print(f'{args.import_module}: 불러오기 {total:.3f}s (예산 {args.import_budget:.3f}s), 프로세스 전체 {wall:.3f}s')
+    if total > args.import_budget:
+        print('예산 초과')
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description='그래프 생성 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', help='설비 행 수 (기본값: 1000 10000 100000, --contingency는 200 400)')
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='기존 방식은 이 행 수 이하에서만 측정')
+    parser.add_argument('--backends', action='store_true', help='networkx와 CSR 저장소 비교')
+    parser.add_argument('--stages', action='store_true', help='가상 설비로 화면 갱신 단계별 시간/메모리 측정')
+    parser.add_argument('--queries', type=int, default=20, help='경로 탐색 단계의 검색 횟수')
+    parser.add_argument('--multipartite-max', type=int, default=100000,
+                        help='nx.multipartite_layout은 이 행 수 이하에서만 측정')
+    parser.add_argument('--levels', type=int, default=10)
+    parser.add_argument('--fan-out', type=float, default=3.0)
+    parser.add_argument('--redundancy', type=float, default=0.3)
+    parser.add_argument('--primary-ratio', type=float, default=0.5)
+    parser.add_argument('--no-memory', action='store_true', help='최대 메모리 측정 생략')
+    parser.add_argument('--save', help='단계별 결과를 저장할 JSON 경로')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON (회귀가 있으면 종료 코드 1)')
+    parser.add_argument('--threshold', type=float, default=1.25, help='기준 대비 허용 배율')
+    parser.add_argument('--contingency', action='store_true',
+                        help='정지 분석(N-1/N-2)을 전수 계산과 비교 (불일치 시 종료 코드 1)')
+    parser.add_argument('--import-time', action='store_true',
+                        help='작업자 시작 시 모듈 불러오기 시간 측정 (예산 초과 시 종료 코드 1)')
+    parser.add_argument('--import-module', default='app')
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET)
+    args = parser.parse_args()
+
+    if args.import_time:
+        import_suite(args)
+        return
+
+    if args.contingency:
+        contingency_suite(args)
+        return
+
+    args.rows = args.rows or [1000, 10000, 100000]
+    if args.stages:
+        stage_suite(args)
+        return
+
+    if args.backends:
+        for rows in args.rows:
+            compare_backends(rows)
+        return
+
+    print(f"{'rows':>8} {'vectorized(s)':>14} {'legacy(s)':>10} {'speedup':>8}")
+    for rows in args.rows:
+        df = generate_plant(rows, off_ratio=0.05)
+        G, fast = measure(create_graph_with_status, df)
+        if rows <= args.legacy_max:
+            G_legacy, slow = measure(legacy_create_graph_with_status, df)
+            assert nx.utils.graphs_equal(G, G_legacy), '기존 방식과 결과가 다릅니다'
+            print(f'{rows:>8} {fast:>14.3f} {slow:>10.3f} {slow / fast:>7.1f}x')
+        else:
+            print(f"{rows:>8} {fast:>14.3f} {'-':>10} {'-':>8}")
+
+if __name__ == '__main__':
+    main()
@@ -1,199 +1,458 @@
-from dash import Input, Output, State, callback_context, ALL
-import dash_html_components as html
-import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-import networkx as nx
-import pandas as pd
-from utils import read_excel, create_graph_with_status
-
-# 엑셀 파일 경로
-excel_path = "pf_example3.xlsx"
-df = read_excel(excel_path)
-
-def register_callbacks(app):
+import os
+import threading
+
+from dash import Input, Output, State, Patch, callback_context, html
+from dash.exceptions import PreventUpdate
+from session import StatusStore
+from table_query import query_equipment, PAGE_SIZE, STATUS, TOGGLE
+from background import background_callback
+from profiling import span
+from reload import RegisterWatcher, RELOAD_INTERVAL
+from layout import PAIR_MAX_CANDIDATES
+import traces
+
+# 엑셀 파일 경로 (환경 변수 PF_EXCEL_PATH 또는 configure로 변경)
+excel_path = os.environ.get('PF_EXCEL_PATH', "pf_example3.xlsx")
+# 장비 상태는 공유 토폴로지 위의 세션별 변경분으로만 저장
+status_store = StatusStore()
+
+_workspace = None
+_workspace_lock = threading.Lock()
+
+def configure(path):
+    global excel_path
+    excel_path = path
+
+# 공유 데이터(장비 목록, 토폴로지, 배치/경로 캐시)는 처음 필요할 때 한 번만 만듦
+# pandas/networkx/openpyxl 같은 무거운 모듈도 이때 불러오므로 작업자가 빨리 뜸
+def current():
+    global _workspace
+    if _workspace is None:
+        with _workspace_lock:
+            if _workspace is None:
+                from workspace import Workspace
+                _workspace = Workspace(excel_path)
+    return _workspace
+
+# 요청을 기다리지 않고 별도 스레드에서 미리 불러옴
+def preload():
+    threading.Thread(target=_preload, name='pf-preload', daemon=True).start()
+
+def _preload():
+    current()
+    # datashader가 있으면 첫 PNG 그림의 JIT 컴파일도 미리 끝내 둠
+    import render
+    render.warm_up()
+
+# 불러온 공유 데이터의 버전 (아직 불러오지 않았으면 None)
+def loaded_version():
+    ws = _workspace
+    return ws.version if ws is not None else None
+
+# 불러온 공유 데이터의 원본 엑셀 내용 해시 (아직 불러오지 않았으면 None, 해시를 모르면 '')
+def loaded_source():
+    ws = _workspace
+    return None if ws is None else ws.sha256 or ''
+
+# 장비 목록을 다시 읽어 새 공유 데이터를 만든 뒤 한 번에 교체
+# 진행 중인 콜백은 이미 받은 이전 객체로 끝까지 처리하고, 이전 버전의 배치/경로 캐시는 객체와 함께 버려짐
+# 내용이 같으면(수정 시각만 바뀐 경우 등) 캐시가 채워진 기존 객체를 그대로 씀
+def reload_workspace():
+    global _workspace
+    from workspace import Workspace
+    ws = Workspace(excel_path)
+    with _workspace_lock:
+        if _workspace is None or _workspace.version != ws.version:
+            _workspace = ws
+        return _workspace.version
+
+# 장비 목록 파일 감시 시작 (바뀌면 백그라운드 스레드에서 다시 읽어 교체)
+def watch(interval=RELOAD_INTERVAL):
+    if interval <= 0:
+        return None
+    watcher = RegisterWatcher(excel_path, reload_workspace, loaded_source, interval)
+    watcher.start()
+    return watcher
+
+# 공유 토폴로지 위에 세션의 상태 변경분을 얹은 뷰
+def session_view(ws, session_id):
+    with span('session_view'):
+        return ws.topology.view(status_store.overrides(session_id))
+
+def path_options(sorted_paths, costs=None):
+    if costs is None:
+        return [{'label': ' -> '.join(path), 'value': str(index)} for index, path in enumerate(sorted_paths)]
+    return [{'label': f"{' -> '.join(path)} (비용 {cost:g})", 'value': str(index)}
+            for index, (path, cost) in enumerate(zip(sorted_paths, costs))]
+
+def path_count_text(sorted_paths, limit):
+    return html.Div([
+        html.Span(f"검색된 경로는 <b>{len(sorted_paths)}가지</b> 입니다"
+                  + (f" (상위 {limit}개)" if len(sorted_paths) == limit else '')),
+        html.Br(), html.Br()
+    ])
+
+def register_callbacks(app, manager=None):
     @app.callback(
         Output('selected-node', 'children'),
         Input('equipment-graph', 'clickData')
     )
     def display_click_data(clickData):
         if clickData:
-            node = clickData['points'][0]['text']
+            point = clickData['points'][0]
+            # 상세 수준 모드의 묶음 노드는 표시 텍스트와 장비 이름이 다름
+            node = point.get('customdata', point['text'])
             return node
         return ''
 
+    # 페이지를 열 때, 그리고 상세 수준(접기 레벨/펼친 장비)이 바뀔 때 그래프 전체를 그림
+    # 그린 그림의 토폴로지 버전을 함께 저장 (장비 목록이 다시 읽히면 전체를 다시 그림)
     @app.callback(
         [Output('equipment-graph', 'figure'),
-         Output('path-output', 'children'),
+         Output('topology-version', 'data')],
+        [Input('session-id', 'data'),
+         Input('lod-level', 'value'),
+         Input('expanded-nodes', 'data'),
+         Input('scenario-applied', 'data'),
+         Input('topology-latest', 'data')]
+    )
+    def render_graph(session_id, lod_level, expanded, applied, latest):
+        # 공유 토폴로지 위에 이 세션의 상태 변경분을 얹은 뷰 (그래프 복사 없음)
+        ws = current()
+        view = session_view(ws, session_id)
+        return ws.build_figure(view, lod_level, expanded), ws.version
+
+    # 주기적으로 서버의 토폴로지 버전을 확인해 그림의 버전과 다르면 알림
+    @app.callback(
+        Output('topology-latest', 'data'),
+        Input('reload-check', 'n_intervals'),
+        State('topology-version', 'data'),
+        prevent_initial_call=True
+    )
+    def check_version(n_intervals, drawn_version):
+        version = loaded_version()
+        if version is None or drawn_version is None or version == drawn_version:
+            raise PreventUpdate
+        return version
+
+    # 그래프에서 클릭한 장비를 펼치거나 다시 접음 (상세 수준 모드에서만)
+    @app.callback(
+        Output('expanded-nodes', 'data'),
+        Input('selected-node', 'children'),
+        [State('expanded-nodes', 'data'),
+         State('lod-level', 'value')],
+        prevent_initial_call=True
+    )
+    def expand_node(selected_node, expanded, lod_level):
+        if lod_level is None or not selected_node:
+            raise PreventUpdate
+        expanded = list(expanded or [])
+        if selected_node in expanded:
+            expanded.remove(selected_node)
+        else:
+            expanded.append(selected_node)
+        return expanded
+
+    # 제어 테이블: 현재 페이지/필터/정렬에 해당하는 행만 조회해서 전송
+    @app.callback(
+        [Output('equipment-table', 'data'),
+         Output('equipment-table', 'page_count')],
+        [Input('equipment-table', 'page_current'),
+         Input('equipment-table', 'page_size'),
+         Input('equipment-table', 'filter_query'),
+         Input('equipment-table', 'sort_by'),
+         Input('session-id', 'data'),
+         Input('scenario-applied', 'data'),
+         Input('topology-latest', 'data')]
+    )
+    def update_table(page_current, page_size, filter_query, sort_by, session_id, applied, latest):
+        ws = current()
+        view = session_view(ws, session_id)
+        with span('table_query'):
+            return query_equipment(ws.topology, view.off, page_current or 0, page_size or PAGE_SIZE, filter_query, sort_by)
+
+    # 상태 변경: 해당 장비의 노드 색, 출력 간선, 테이블 행만 패치
+    @app.callback(
+        [Output('equipment-graph', 'figure', allow_duplicate=True),
+         Output('equipment-table', 'data', allow_duplicate=True),
+         Output('equipment-table', 'active_cell')],
+        Input('equipment-table', 'active_cell'),
+        [State('session-id', 'data'),
+         State('lod-level', 'value'),
+         State('expanded-nodes', 'data'),
+         State('topology-version', 'data')],
+        prevent_initial_call=True
+    )
+    def toggle_status(active_cell, session_id, lod_level, expanded, drawn_version):
+        if not active_cell or active_cell['column_id'] != TOGGLE:
+            raise PreventUpdate
+        selected_node = active_cell['row_id']
+        ws = current()
+        topology, layout_cache = ws.topology, ws.layout_cache
+        view = session_view(ws, session_id)
+        new_status = 'off' if view.is_on(selected_node) else 'on'
+        with span('status_store'):
+            status_store.set_status(session_id, selected_node, new_status, topology.base_status(selected_node))
+
+        # 현재 페이지에서 해당 행의 장비상태 칸만 수정하고, 같은 칸을 다시 누를 수 있도록 선택 해제
+        table = Patch()
+        table[active_cell['row']][STATUS] = new_status
+
+        # 상세 수준 모드의 그림은 보이는 장비만 담고 있어 작으므로 통째로 다시 그림
+        # 그림이 이전 버전의 토폴로지로 그려졌으면 위치가 맞지 않으므로 패치하지 않고 다시 그림
+        if lod_level is not None or drawn_version != ws.version:
+            view = session_view(ws, session_id)
+            return ws.build_figure(view, lod_level, expanded), table, None
+
+        with span('patch'):
+            layout_cache.layout(view.graph, key=topology.version)
+            fig = Patch()
+            fig['data'][1]['marker']['color'][layout_cache.index[selected_node]] = traces.node_colors([new_status])[0]
+            for slot in topology.out_slots.get(selected_node, []):
+                parent, child = topology.edges[slot]
+                if new_status == 'on':
+                    x0, y0 = layout_cache.pos[parent]
+                    x1, y1 = layout_cache.pos[child]
+                    xs, ys = [float(x0), float(x1)], [float(y0), float(y1)]
+                else:
+                    xs, ys = [None, None], [None, None]
+                fig['data'][0]['x'][3 * slot] = xs[0]
+                fig['data'][0]['x'][3 * slot + 1] = xs[1]
+                fig['data'][0]['y'][3 * slot] = ys[0]
+                fig['data'][0]['y'][3 * slot + 1] = ys[1]
+        return fig, table, None
+
+    # 경로 탐색: 백그라운드 작업으로 실행하고, 탐색 중에는 지금까지 찾은 경로를 드롭다운에 올려 바로 고를 수 있게 함
+    @background_callback(
+        app, manager,
+        [Output('path-output', 'children'),
          Output('path-count', 'children'),
          Output('path-dropdown', 'options'),
-         Output('controls', 'children')],
+         Output('path-query', 'data'),
+         Output('path-results', 'data'),
+         Output('equipment-graph', 'figure', allow_duplicate=True)],
         [Input('find-path', 'n_clicks'),
          Input('sort-priority-button', 'n_clicks'),
          Input('sort-shortest-button', 'n_clicks'),
-         Input('path-dropdown', 'value'),
-         Input({'type': 'toggle-status', 'index': ALL}, 'n_clicks')],
+         Input('sort-cost-button', 'n_clicks')],
         [State('start-node', 'value'),
          State('end-node', 'value'),
-         State('controls', 'children'),
          State('filter-dropdown', 'value'),
-         State('filter-input', 'value')]
+         State('filter-input', 'value'),
+         State('session-id', 'data')],
+        progress=[Output('path-count', 'children'),
+                  Output('path-dropdown', 'options'),
+                  Output('path-results', 'data')],
+        running=[(Output('find-path', 'disabled'), True, False),
+                 (Output('cancel-search', 'disabled'), False, True)],
+        cancel=[Input('cancel-search', 'n_clicks')],
+        prevent_initial_call=True
     )
-    def update_graph(path_clicks, priority_sort_clicks, shortest_sort_clicks, selected_path_index, toggle_clicks, start_node, end_node, controls, filter_condition, filter_value):
-        ctx = callback_context
-        triggered_id = ctx.triggered[0]['prop_id'].split('.')[0]
-
-        # 상태 변경
-        if 'toggle-status' in triggered_id:
-            selected_node = eval(triggered_id.split('.')[0])['index']
-            current_status = df.loc[df['장비 이름'] == selected_node, '상태'].values[0]
-            new_status = 'off' if current_status == 'on' else 'on'
-            df.loc[df['장비 이름'] == selected_node, '상태'] = new_status
-
-        # 그래프 생성
-        G = create_graph_with_status(df)
-
-        pos = nx.multipartite_layout(G, subset_key="level")
-
-        edge_x = []
-        edge_y = []
-        for edge in G.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.append(x0)
-            edge_x.append(x1)
-            edge_x.append(None)
-            edge_y.append(y0)
-            edge_y.append(y1)
-            edge_y.append(None)
-
-        edge_trace = go.Scatter(
-            x=edge_x, y=edge_y,
-            line=dict(width=2, color='#888'),
-            hoverinfo='none',
-            mode='lines')
-
-        node_x = []
-        node_y = []
-        node_text = []
-        node_color = []
-        for node in G.nodes():
-            x, y = pos[node]
-            node_x.append(x)
-            node_y.append(y)
-            node_text.append(node)
-            node_color.append('blue' if df[df['장비 이름'] == node]['상태'].values[0] == 'on' else 'red')
-
-        node_trace = go.Scatter(
-            x=node_x, y=node_y,
-            mode='markers+text',
-            hoverinfo='text',
-            text=node_text,
-            marker=dict(
-                showscale=False,
-                color=node_color,
-                size=10,
-                line_width=2))
-
-        fig = go.Figure(data=[edge_trace, node_trace],
-                     layout=go.Layout(
-                        showlegend=False,
-                        hovermode='closest',
-                        margin=dict(b=0, l=0, r=0, t=0),
-                        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-                        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False)
-                     ))
-
-        # Controls for toggling status
-        controls = []
-        nodes_by_level = sorted(G.nodes(data=True), key=lambda x: x[1]['level'])
-        table_header = [
-            html.Thead(html.Tr([html.Th("레벨", style={'textAlign': 'center'}), 
-                                html.Th("장비명", style={'textAlign': 'center'}), 
-                                html.Th("장비상태", style={'textAlign': 'center'}), 
-                                html.Th("토글 버튼", style={'textAlign': 'center'})]))
-        ]
-        table_body = []
-        for level in sorted(set(data['level'] for node, data in G.nodes(data=True))):
-            for node, data in nodes_by_level:
-                if data['level'] == level:
-                    current_status = df.loc[df['장비 이름'] == node, '상태'].values[0]
-                    status_color = 'red' if current_status == 'on' else 'green'
-                    table_body.append(html.Tr([
-                        html.Td(level, style={'textAlign': 'center'}),
-                        html.Td(node, style={'textAlign': 'center'}),
-                        html.Td(current_status, style={'color': status_color, 'textAlign': 'center'}),
-                        html.Td(html.Button('Toggle Status', id={'type': 'toggle-status', 'index': node}, n_clicks=0), style={'textAlign': 'center'})
-                    ]))
-        controls = dbc.Table(table_header + [html.Tbody(table_body)], bordered=True, striped=True, hover=True, responsive=True)
+    def update_paths(set_progress, path_clicks, priority_sort_clicks, shortest_sort_clicks, cost_sort_clicks, start_node, end_node, filter_condition, filter_value, session_id):
+        triggered_id = callback_context.triggered[0]['prop_id'].split('.')[0]
+        if 'sort-priority-button' in triggered_id:
+            sort = 'priority'
+        elif 'sort-shortest-button' in triggered_id:
+            sort = 'shortest'
+        elif 'sort-cost-button' in triggered_id:
+            sort = 'cost'
+        else:
+            sort = None
+        path_query = {
+            'start': start_node,
+            'end': end_node,
+            # 필터 조건 적용
+            'must_include': filter_value if filter_condition == 'node' and filter_value else None,
+            'must_avoid': filter_value if filter_condition == 'avoid' and filter_value else None,
+            'sort': sort,
+        }
 
-        # 경로 찾기 및 시각화
         path_output = ''
         path_count = ''
-        dropdown_options = []
-        path_traces = []
+        sorted_paths, costs = [], None
+        # 새로 검색하면 이전에 강조한 경로는 지움
+        fig = Patch()
+        fig['data'][2]['x'] = []
+        fig['data'][2]['y'] = []
 
         if start_node and end_node:
-            try:
-                G_with_status = create_graph_with_status(df[df['상태'] == 'on'])
+            ws = current()
+            view = session_view(ws, session_id)
+            G_with_status = view.active
+            if start_node not in G_with_status.nodes:
+                path_output = f'Start node {start_node} not found in the graph.'
+            elif end_node not in G_with_status.nodes:
+                path_output = f'End node {end_node} not found in the graph.'
+            else:
+                # 캐시에 없으면 탐색하면서 주기적으로 (진행 상황, 부분 결과 드롭다운, 부분 결과)를 전달
+                def progress(scanned, partial, partial_costs):
+                    set_progress([f'탐색 중: 경로 {scanned}개 확인, {len(partial)}개 선택 가능',
+                                  path_options(partial, partial_costs), partial])
 
-                if start_node not in G_with_status.nodes:
-                    path_output = f'Start node {start_node} not found in the graph.'
-                elif end_node not in G_with_status.nodes:
-                    path_output = f'End node {end_node} not found in the graph.'
+                with span('path_search'):
+                    sorted_paths, costs = ws.search(view, path_query, progress)
+                if not sorted_paths:
+                    path_output = 'No path found.'
                 else:
-                    all_paths = list(nx.all_shortest_paths(G_with_status, source=start_node, target=end_node))
+                    path_count = path_count_text(sorted_paths, ws.top_k)
+                    if triggered_id == 'find-path':
+                        path_output = ' -> '.join(sorted_paths[0])
+
+        return path_output, path_count, path_options(sorted_paths, costs), path_query, sorted_paths, fig
+
+    # 드롭다운에서 고른 경로(탐색 중 부분 결과 포함)를 그래프에 강조
+    @app.callback(
+        Output('equipment-graph', 'figure', allow_duplicate=True),
+        Input('path-dropdown', 'value'),
+        [State('path-results', 'data'),
+         State('session-id', 'data'),
+         State('lod-level', 'value'),
+         State('expanded-nodes', 'data')],
+        prevent_initial_call=True
+    )
+    def highlight_path(selected_path_index, sorted_paths, session_id, lod_level, expanded):
+        path_x, path_y = [], []
+        if selected_path_index is not None and sorted_paths and int(selected_path_index) < len(sorted_paths):
+            selected_path = sorted_paths[int(selected_path_index)]
+            ws = current()
+            view = session_view(ws, session_id)
+            with span('layout'):
+                positions = ws.figure_layout(view, lod_level, expanded)
+            # 상세 수준 모드에서는 보이는 장비 사이의 구간만 강조
+            with span('traces'):
+                path_edges = traces.edge_index(
+                    [edge for edge in zip(selected_path, selected_path[1:])
+                     if edge[0] in positions.index and edge[1] in positions.index],
+                    positions.index)
+                path_x, path_y = traces.edge_coordinates(positions.array, path_edges, patchable=True)
 
-                                        # 필터 조건 적용
-                    if filter_condition == 'node' and filter_value:
-                        filtered_paths = [path for path in all_paths if filter_value in path]
-                    else:
-                        filtered_paths = all_paths
+        fig = Patch()
+        fig['data'][2]['x'] = path_x
+        fig['data'][2]['y'] = path_y
+        return fig
 
-                    # 정렬 조건 적용
-                    if 'sort-priority-button' in triggered_id:
-                        sorted_paths = sorted(filtered_paths, key=lambda path: sum(df[df['장비 이름'].isin(path)]['주예비'] == 'A'), reverse=True)
-                    elif 'sort-shortest-button' in triggered_id:
-                        sorted_paths = sorted(filtered_paths, key=lambda path: len(path))
-                    else:
-                        sorted_paths = filtered_paths
+    # 단일(선택 시 이중) 장비 정지 분석: 백그라운드 작업으로 실행하고 차단 부하 수 순으로 표시
+    @background_callback(
+        app, manager,
+        [Output('contingency-progress', 'children'),
+         Output('contingency-table', 'data'),
+         Output('contingency-pair-table', 'data')],
+        Input('contingency-button', 'n_clicks'),
+        [State('contingency-pairs', 'value'),
+         State('contingency-pair-level', 'value'),
+         State('session-id', 'data')],
+        progress=[Output('contingency-progress', 'children')],
+        running=[(Output('contingency-button', 'disabled'), True, False),
+                 (Output('cancel-contingency', 'disabled'), False, True)],
+        cancel=[Input('cancel-contingency', 'n_clicks')],
+        prevent_initial_call=True
+    )
+    def run_contingency(set_progress, n_clicks, options, pair_max_level, session_id):
+        from contingency import criticality_report
+        view = session_view(current(), session_id)
+        pairs = 'pairs' in (options or [])
+        set_progress(['단일 장비 정지 분석 중...'])
+        with span('contingency'):
+            # 조합 분석은 레벨 상한(입력한 경우)과 후보 수 상한으로 제한
+            report, pair_report = criticality_report(
+                view, pairs=pairs, pair_max_level=pair_max_level, pair_max_candidates=PAIR_MAX_CANDIDATES,
+                progress=lambda done, total: set_progress([f'이중 정지 분석 중: {done} / {total}']))
+        report['차단 비율'] = report['차단 비율'].round(3)
+        summary = f'장비 {len(report)}개 분석 완료'
+        if pair_report is not None:
+            limit = f'레벨 {pair_max_level} 이하, ' if pair_max_level is not None else ''
+            summary += (f", 조합 후보 {pair_report.attrs['candidates']}개({limit}최대 {PAIR_MAX_CANDIDATES}개) 중 "
+                        f'단일 정지보다 더 많이 차단되는 장비 조합 {len(pair_report)}개')
+        return (summary, report.to_dict('records'),
+                pair_report.to_dict('records') if pair_report is not None else [])
 
-                    path_count = html.Div([
-                        html.Span(f"검색된 경로는 <b>{len(sorted_paths)}가지</b> 입니다"),
-                        html.Br(), html.Br()
-                    ])
+    # 통전 부하 보기: 공급원에서 on 장비만 지나 도달하는 부하와 정전 부하 목록
+    @app.callback(
+        Output('energized-loads', 'children'),
+        Input('energized-button', 'n_clicks'),
+        State('session-id', 'data'),
+        prevent_initial_call=True
+    )
+    def show_energized_loads(n_clicks, session_id):
+        ws = current()
+        view = session_view(ws, session_id)
+        with span('reachability'):
+            energized, outage = ws.reachability.energized_loads(view.status_key())
+        return html.Div([
+            html.P(f"통전 부하 {len(energized)}개 / 정전 부하 {len(outage)}개"),
+            html.P('정전 부하: ' + (', '.join(outage) if outage else '없음'), style={'color': 'green'}),
+        ])
 
-                    dropdown_options = [{'label': ' -> '.join(path), 'value': str(index)} for index, path in enumerate(sorted_paths)]
+    # 시나리오 저장(현재 상태에서 분기)/적용/삭제 후 시나리오 목록 갱신
+    @app.callback(
+        [Output('scenario-dropdown', 'options'),
+         Output('scenario-dropdown', 'value'),
+         Output('scenario-status', 'children'),
+         Output('scenario-applied', 'data')],
+        [Input('scenario-fork', 'n_clicks'),
+         Input('scenario-apply', 'n_clicks'),
+         Input('scenario-discard', 'n_clicks'),
+         Input('session-id', 'data')],
+        [State('scenario-name', 'value'),
+         State('scenario-dropdown', 'value'),
+         State('scenario-applied', 'data')]
+    )
+    def manage_scenarios(fork_clicks, apply_clicks, discard_clicks, session_id, name, selected, applied):
+        triggered_id = callback_context.triggered[0]['prop_id'].split('.')[0]
+        selected = list(selected or [])
+        message = ''
+        if triggered_id == 'scenario-fork':
+            if not name or not name.strip():
+                message = '시나리오 이름을 입력하세요.'
+            else:
+                status_store.fork(session_id, name.strip())
+                message = f'현재 상태를 시나리오 {name.strip()}(으)로 저장했습니다.'
+        elif triggered_id == 'scenario-apply':
+            if len(selected) != 1:
+                message = '적용할 시나리오를 하나만 선택하세요.'
+            else:
+                status_store.apply(session_id, selected[0])
+                applied = (applied or 0) + 1
+                message = f'시나리오 {selected[0]}의 상태를 적용했습니다.'
+        elif triggered_id == 'scenario-discard':
+            for scenario in selected:
+                status_store.discard(session_id, scenario)
+            message = f"시나리오 {', '.join(selected)}을(를) 삭제했습니다." if selected else '삭제할 시나리오를 선택하세요.'
+            selected = []
+        names = status_store.scenarios(session_id)
+        selected = [scenario for scenario in selected if scenario in names]
+        return [{'label': scenario, 'value': scenario} for scenario in names], selected, message, applied
 
-                    if triggered_id == 'find-path':
-                        path_output = ' -> '.join(sorted_paths[0])
-                    elif triggered_id == 'path-dropdown' and selected_path_index is not None:
-                        selected_path = sorted_paths[int(selected_path_index)]
-                        path_edges = list(zip(selected_path, selected_path[1:]))
-
-                        edge_x = []
-                        edge_y = []
-                        for edge in path_edges:
-                            x0, y0 = pos[edge[0]]
-                            x1, y1 = pos[edge[1]]
-                            edge_x.append(x0)
-                            edge_x.append(x1)
-                            edge_x.append(None)
-                            edge_y.append(y0)
-                            edge_y.append(y1)
-                            edge_y.append(None)
-
-                        path_trace = go.Scatter(
-                            x=edge_x, y=edge_y,
-                            line=dict(width=4, color='green'),
-                            hoverinfo='none',
-                            mode='lines')
-                        path_traces.append(path_trace)
-
-                    fig.add_traces(path_traces)
-            except nx.NetworkXNoPath:
-                path_output = 'No path found.'
-
-        return fig, path_output, path_count, dropdown_options, controls
+    # 선택한 시나리오(없으면 전체)를 현재 상태와 비교: 정전/복구 부하와 시작-끝 장비 연결 변화
+    @background_callback(
+        app, manager,
+        [Output('scenario-progress', 'children'),
+         Output('scenario-table', 'data'),
+         Output('scenario-pair-table', 'data')],
+        Input('scenario-compare', 'n_clicks'),
+        [State('scenario-dropdown', 'value'),
+         State('start-node', 'value'),
+         State('end-node', 'value'),
+         State('session-id', 'data')],
+        progress=[Output('scenario-progress', 'children')],
+        running=[(Output('scenario-compare', 'disabled'), True, False)],
+        prevent_initial_call=True
+    )
+    def run_scenario_compare(set_progress, n_clicks, selected, start_node, end_node, session_id):
+        names = selected or status_store.scenarios(session_id)
+        if not names:
+            return '비교할 시나리오가 없습니다.', [], []
+        scenarios = {name: status_store.overrides(status_store.scenario_key(session_id, name)) for name in names}
+        pairs = [(start_node, end_node)] if start_node and end_node else []
+        from scenario import compare_scenarios
+        ws = current()
+        with span('scenario_compare'):
+            summary, pair_report = compare_scenarios(
+                ws.topology, scenarios, pairs, baseline=status_store.overrides(session_id),
+                model=ws.route_model, index=ws.reachability,
+                progress=lambda done, total: set_progress([f'시나리오 평가 중: {done} / {total}']))
+        return (f'시나리오 {len(names)}개를 현재 상태와 비교했습니다.',
+                summary.to_dict('records'), pair_report.to_dict('records'))
 
     @app.callback(
         Output("modal", "is_open"),
@@ -208,17 +467,32 @@ def register_callbacks(app):
     @app.callback(
         Output("modal-body", "children"),
         Input("output-button", "n_clicks"),
-        [State('path-dropdown', 'value'), State('start-node', 'value'), State('end-node', 'value')]
+        [State('path-dropdown', 'value'), State('path-results', 'data'), State('session-id', 'data')]
     )
-    def display_selected_path_info(n_clicks, selected_path_index, start_node, end_node):
-        if selected_path_index is not None:
-            G_with_status = create_graph_with_status(df[df['상태'] == 'on'])
-
-            selected_path = list(nx.all_shortest_paths(G_with_status, source=start_node, target=end_node))[int(selected_path_index)]
+    def display_selected_path_info(n_clicks, selected_path_index, sorted_paths, session_id):
+        if selected_path_index is not None and sorted_paths is not None:
+            # 경로 탐색 작업이 드롭다운을 만들 때 저장한 결과를 그대로 사용
+            ws = current()
+            view = session_view(ws, session_id)
+            if int(selected_path_index) >= len(sorted_paths):
+                return "경로가 선택되지 않았습니다."
+            selected_path = sorted_paths[int(selected_path_index)]
+            # 레벨은 상태와 관계없는 구조 그래프에서 읽음 (경로를 찾은 뒤 꺼진 장비도 표시)
+            # 다시 읽은 장비 목록에 없는 장비는 '없음'으로 표시
+            base_nodes = view.topology.base.nodes
             path_info = []
             for node in selected_path:
-                level = G_with_status.nodes[node]['level']
-                status = df.loc[df['장비 이름'] == node, '상태'].values[0]
+                if node not in base_nodes:
+                    path_info.append(html.Tr([
+                        html.Td('-', style={'textAlign': 'center'}),
+                        html.Td(node, style={'textAlign': 'center'}),
+                        html.Td('없음', style={'color': 'gray', 'textAlign': 'center'}),
+                        html.Td('-', style={'textAlign': 'center'}),
+                        html.Td('-', style={'textAlign': 'center'})
+                    ]))
+                    continue
+                level = base_nodes[node]['level']
+                status = view.status(node)
                 status_color = 'red' if status == 'on' else 'green'
                 path_info.append(html.Tr([
                     html.Td(level, style={'textAlign': 'center'}),
@@ -227,7 +501,7 @@ def register_callbacks(app):
                     html.Td("off", style={'color': 'green', 'textAlign': 'center'}),  # 현재 상태는 'off'로 설정
                     html.Td(html.Button('조작', id={'type': 'control-button', 'index': node}, n_clicks=0), style={'textAlign': 'center'})
                 ]))
-            return html.Table([
+            table = html.Table([
                 html.Thead(html.Tr([html.Th("레벨", style={'textAlign': 'center'}), 
                                     html.Th("장비명", style={'textAlign': 'center'}), 
                                     html.Th("PF 권고 상태", style={'textAlign': 'center'}), 
@@ -235,4 +509,6 @@ def register_callbacks(app):
                                     html.Th("자동제어", style={'textAlign': 'center'})])),
                 html.Tbody(path_info)
             ], style={'width': '100%', 'border': '1px solid black', 'textAlign': 'center'})
+            return html.Div([html.P(f"경로 내 주장비 {ws.topology.score_path(selected_path)}개, "
+                                    f"경로 비용 {ws.route_model.path_cost(selected_path):g}"), table])
         return "경로가 선택되지 않았습니다."
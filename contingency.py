@@ -0,0 +1,185 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import networkx as nx
+import pandas as pd
+
+from snapshot import load_equipment
+from topology import Topology
+
+# 모든 최상위 공급원(부모가 없는 장비)에 연결되는 가상 공급 노드
+SUPPLY = ('__supply__',)
+# 보고서에 이름을 나열할 최대 차단 부하 수
+LIST_LIMIT = 10
+
+# 현재 상태의 공급 그래프: on 장비와 그 사이 간선 + 가상 공급 노드
+# 부하는 전체 구조에서 자식이 없는 장비
+def supply_graph(view):
+    base = view.topology.base
+    G = nx.DiGraph(view.active)
+    roots = [node for node in G if base.in_degree(node) == 0]
+    G.add_node(SUPPLY)
+    G.add_edges_from((SUPPLY, node) for node in roots)
+    loads = {node for node in G if node != SUPPLY and base.out_degree(node) == 0}
+    return G, loads
+
+# 가상 공급 노드 기준 지배자 트리(dominator tree)
+#   장비 v가 off 되면 공급을 잃는 장비 = 지배자 트리에서 v의 하위 트리
+# 반환: 직계 지배자, 자식 목록, 하위 트리의 부하 수, 하위 트리 구간(pre/post 순번)
+def dominator_tree(G, loads):
+    idom = nx.immediate_dominators(G, SUPPLY)
+    children = {}
+    for node, dom in idom.items():
+        if node != SUPPLY:
+            children.setdefault(dom, []).append(node)
+
+    order = [SUPPLY]
+    for node in order:
+        order.extend(children.get(node, ()))
+    count = {node: int(node in loads) for node in order}
+    for node in reversed(order):
+        if node != SUPPLY:
+            count[idom[node]] += count[node]
+
+    # 하위 트리 포함 여부를 상수 시간에 판별하기 위한 DFS 순번
+    pre, post = {}, {}
+    clock = 0
+    stack = [(SUPPLY, False)]
+    while stack:
+        node, done = stack.pop()
+        if done:
+            post[node] = clock
+            continue
+        pre[node] = clock
+        clock += 1
+        stack.append((node, True))
+        stack.extend((child, False) for child in children.get(node, ()))
+    return idom, children, count, pre, post
+
+# 장비 하나의 지배자 하위 트리에 속한 부하 (자기 자신 제외)
+def lost_loads(children, loads, node):
+    lost = []
+    stack = list(children.get(node, ()))
+    while stack:
+        child = stack.pop()
+        if child in loads:
+            lost.append(child)
+        stack.extend(children.get(child, ()))
+    return lost
+
+# 단일 장비 정지(N-1): 지배자 트리 한 번으로 모든 장비의 차단 부하 수를 계산
+def single_outages(G, loads):
+    idom, children, count, pre, post = dominator_tree(G, loads)
+    single = {node: count[node] - (node in loads) for node in idom if node != SUPPLY}
+    return single, children, pre, post
+
+# 프로세스 풀 작업자: 공급 그래프를 작업자마다 한 번만 받아 둠
+_worker = {}
+
+def _init_worker(G, loads, single, pre, post):
+    _worker.update(G=G, loads=loads, single=single, pre=pre, post=post)
+
+# 장비 u를 제거한 그래프의 지배자 트리로 (u, v) 동시 정지의 차단 부하 수를 계산하고
+# 각각의 단일 정지 결과를 합친 것보다 더 많이 차단되는 조합만 반환
+def _pair_outages(task):
+    first, candidates = task
+    G, loads, single, pre, post = (_worker[key] for key in ('G', 'loads', 'single', 'pre', 'post'))
+    # 작업자마다 그래프 사본을 가지고 있으므로 u를 잠시 제거했다가 복원
+    edges = list(G.in_edges(first, data=False)) + list(G.out_edges(first, data=False))
+    attrs = G.nodes[first]
+    G.remove_node(first)
+    try:
+        idom, children, count, _, _ = dominator_tree(G, loads)
+    finally:
+        G.add_node(first, **attrs)
+        G.add_edges_from(edges)
+    # 후보는 부하가 아닌 장비이므로 차단 부하 = u 단일 정지분 + u 제거 후 v의 하위 트리 부하
+    results = []
+    for second in candidates:
+        lost = single[first] + count.get(second, 0)
+        # 한 장비가 다른 장비를 지배하면 단일 정지 결과가 겹침
+        if pre[first] <= pre[second] and post[second] <= post[first]:
+            alone = single[first]
+        elif pre[second] <= pre[first] and post[first] <= post[second]:
+            alone = single[second]
+        else:
+            alone = single[first] + single[second]
+        if lost > alone:
+            results.append((first, second, lost, lost - alone))
+    return results
+
+# 두 장비 동시 정지(N-2): 후보 장비 u마다 지배자 트리를 다시 계산, 프로세스 풀로 병렬 처리
+# progress(완료한 후보 수, 전체 후보 수)가 있으면 결과가 올 때마다 호출
+def pair_outages(G, loads, single, pre, post, candidates, workers=None, progress=None):
+    candidates = [node for node in candidates if node in pre]
+    tasks = [(first, candidates[i + 1:]) for i, first in enumerate(candidates[:-1])]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(G, loads, single, pre, post)) as pool:
+        results = []
+        chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+        for done, chunk in enumerate(pool.map(_pair_outages, tasks, chunksize=chunksize), start=1):
+            results.extend(chunk)
+            if progress is not None:
+                progress(done, len(tasks))
+    return results
+
+# 장비별 중요도 보고서 (차단 부하 수 내림차순)
+#   pair_max_level: 이 레벨 이하의 장비만 조합 후보로 사용
+#   pair_max_candidates: 조합 후보를 단일 정지 차단 부하 수가 많은 순으로 최대 이 개수까지 (N-2는 후보 수의 제곱에 비례)
+def criticality_report(view, pairs=False, pair_max_level=None, workers=None, progress=None, pair_max_candidates=None):
+    G, loads = supply_graph(view)
+    single, children, pre, post = single_outages(G, loads)
+    total = sum(1 for node in loads if node in pre)
+    levels = dict(G.nodes(data='level'))
+
+    report = pd.DataFrame({
+        '장비 이름': list(single),
+        '레벨': [levels[node] for node in single],
+        '차단 부하 수': list(single.values()),
+    })
+    report['차단 비율'] = report['차단 부하 수'] / max(total, 1)
+    report = report.sort_values(['차단 부하 수', '레벨'], ascending=[False, True], kind='stable').reset_index(drop=True)
+    report['차단 부하'] = [', '.join(lost_loads(children, loads, node)[:LIST_LIMIT]) if count else ''
+                        for node, count in zip(report['장비 이름'], report['차단 부하 수'])]
+
+    if not pairs:
+        return report, None
+    # 부하가 아닌 장비(분기 장비)만 조합 후보로 사용, 레벨 상한과 후보 수 상한으로 제한 (보고서 순서 = 중요한 순)
+    candidates = [node for node in report['장비 이름']
+                  if node not in loads and (pair_max_level is None or levels[node] <= pair_max_level)]
+    if pair_max_candidates is not None:
+        candidates = candidates[:pair_max_candidates]
+    pair_report = pd.DataFrame(pair_outages(G, loads, single, pre, post, candidates, workers, progress),
+                               columns=['장비 1', '장비 2', '차단 부하 수', '추가 차단 부하 수'])
+    pair_report = pair_report.sort_values(['추가 차단 부하 수', '차단 부하 수'], ascending=False,
+                                          kind='stable').reset_index(drop=True)
+    pair_report.attrs['candidates'] = len(candidates)
+    return report, pair_report
+
+def main():
+    parser = argparse.ArgumentParser(description='장비 단일/이중 정지 시 공급을 잃는 부하 분석')
+    parser.add_argument('excel_path')
+    parser.add_argument('-o', '--output', default='contingency.csv', help='단일 정지 보고서 CSV 경로')
+    parser.add_argument('--pairs', action='store_true', help='두 장비 동시 정지(N-2)도 분석')
+    parser.add_argument('--pair-max-level', type=int, help='이 레벨 이하의 장비만 조합 후보로 사용')
+    parser.add_argument('--pair-max-candidates', type=int, help='조합 후보 최대 수 (단일 정지 차단 부하 수가 많은 순)')
+    parser.add_argument('--pair-output', default='contingency_pairs.csv', help='이중 정지 보고서 CSV 경로')
+    parser.add_argument('--workers', type=int, help='프로세스 수 (기본값: CPU 수)')
+    parser.add_argument('--top', type=int, default=20, help='화면에 출력할 상위 장비 수')
+    args = parser.parse_args()
+
+    df, edges = load_equipment(args.excel_path, edges=True)
+    topology = Topology(df, edges=edges)
+    report, pair_report = criticality_report(topology.view({}), args.pairs, args.pair_max_level, args.workers,
+                                             pair_max_candidates=args.pair_max_candidates)
+    report.to_csv(args.output, index=False, encoding='utf-8-sig')
+    print(report.head(args.top).to_string(index=False))
+    print(f'{len(report)}개 장비 -> {args.output}')
+    if pair_report is not None:
+        pair_report.to_csv(args.pair_output, index=False, encoding='utf-8-sig')
+        print(pair_report.head(args.top).to_string(index=False))
+        print(f'{len(pair_report)}개 조합 -> {args.pair_output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+# 행별 (부모 수) 배열로부터 CSR 구간의 모든 원소 위치를 한 번에 계산
+def ranges(starts, lengths):
+    total = int(lengths.sum())
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + (np.arange(total) - offsets)
+
+def _csr(keys, values, size):
+    order = np.argsort(keys, kind='stable')
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=indptr[1:])
+    return indptr, values[order].astype(np.int32)
+
+# 장비 이름을 int32 번호로 바꾸고 인접 관계를 CSR(indptr/indices) 배열로 보관하는 토폴로지 저장소
+#   out_indptr/out_indices: 부모 -> 자식, in_indptr/in_indices: 자식 -> 부모
+#   level/on: 노드별 레벨과 on 여부 (중복된 장비 이름은 마지막 행 기준, create_graph_with_status와 동일)
+class CSRTopology:
+    def __init__(self, names, level, on, edges):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names.tolist())}
+        self.level = level
+        self.on = on
+        size = len(names)
+        self.out_indptr, self.out_indices = _csr(edges[:, 0], edges[:, 1], size)
+        self.in_indptr, self.in_indices = _csr(edges[:, 1], edges[:, 0], size)
+
+    def __len__(self):
+        return len(self.names)
+
+    # name_table: 이름 사전, row_name: 행별 이름 번호, parent_indptr/parent_indices: 행별 부모 이름 번호 (CSR)
+    @classmethod
+    def from_arrays(cls, name_table, row_name, level, status, parent_indptr, parent_indices):
+        row_name = np.asarray(row_name)
+        rows = len(row_name)
+        # 행에 등장한 이름만 노드로 사용하고 첫 등장 순서대로 번호 부여
+        present, first = np.unique(row_name, return_index=True)
+        node_table_ids = present[np.argsort(first)]
+        to_node = np.full(len(name_table), -1, dtype=np.int64)
+        to_node[node_table_ids] = np.arange(len(node_table_ids))
+        names = np.asarray(name_table)[node_table_ids]
+
+        # 같은 이름이 여러 행이면 마지막 행의 레벨과 상태 사용
+        last = np.full(len(node_table_ids), 0, dtype=np.int64)
+        last[to_node[row_name]] = np.arange(rows)
+        node_level = np.asarray(level)[last].astype(np.int32)
+        node_on = np.asarray(status)[last] == 'on'
+
+        counts = np.diff(np.asarray(parent_indptr))
+        child = to_node[np.repeat(row_name, counts)]
+        parent = to_node[np.asarray(parent_indices)]
+        # 데이터에 없는 부모 장비는 제외하고 중복 간선 제거
+        keep = parent >= 0
+        keys = np.unique(parent[keep] * len(names) + child[keep])
+        edges = np.column_stack([keys // len(names), keys % len(names)]).astype(np.int64)
+        return cls(names, node_level, node_on, edges.reshape(-1, 2))
+
+    @classmethod
+    def from_dataframe(cls, df):
+        codes, name_table = pd.factorize(
+            pd.concat([df['장비 이름'], df['부모 장비'].dropna().astype(str).str.split(',').explode().str.strip()]))
+        row_name = codes[:len(df)]
+        parent_indices = codes[len(df):]
+        parent_column = df['부모 장비']
+        counts = parent_column.astype(str).str.split(',').str.len().where(parent_column.notna(), 0).to_numpy(dtype=np.int64)
+        parent_indptr = np.concatenate([[0], np.cumsum(counts)])
+        return cls.from_arrays(np.asarray(name_table, dtype=object), row_name, df['레벨'].to_numpy(),
+                               np.asarray(df['상태']), parent_indptr, parent_indices)
+
+    # off 장비 집합을 반영한 탐색용 사본 (인접 배열은 공유하고 on 배열만 새로 만듦 -> 세션마다 만들어도 공유 저장소는 그대로)
+    def with_off(self, off):
+        view = copy.copy(self)
+        view.on = np.ones(len(self), dtype=bool)
+        ids = [self.ids[node] for node in off if node in self.ids]
+        view.on[ids] = False
+        return view
+
+    def children(self, node):
+        return self.out_indices[self.out_indptr[node]:self.out_indptr[node + 1]]
+
+    def parents(self, node):
+        return self.in_indices[self.in_indptr[node]:self.in_indptr[node + 1]]
+
+    # on 장비만 지나는 너비 우선 탐색: 각 노드까지의 거리 (도달 불가 -1)
+    # 프런티어 단위로 인접 노드를 한 번에 모아 처리, target에 도달한 레벨에서 멈춤
+    def bfs(self, source, target=None):
+        dist = np.full(len(self), -1, dtype=np.int32)
+        if not self.on[source]:
+            return dist
+        dist[source] = 0
+        frontier = np.array([source])
+        depth = 0
+        while len(frontier) and (target is None or dist[target] < 0):
+            depth += 1
+            starts = self.out_indptr[frontier]
+            nxt = self.out_indices[ranges(starts, self.out_indptr[frontier + 1] - starts)]
+            nxt = np.unique(nxt[(dist[nxt] < 0) & self.on[nxt]])
+            dist[nxt] = depth
+            frontier = nxt
+        return dist
+
+    # 최단 경로를 노드 번호 목록으로 하나씩 생성 (BFS 거리로 선행 노드를 역추적)
+    def iter_shortest_path_ids(self, source, target, dist=None):
+        if dist is None:
+            dist = self.bfs(source, target)
+        if dist[target] < 0:
+            raise nx.NetworkXNoPath(f'No path between {self.names[source]} and {self.names[target]}.')
+        # 경로 버퍼 하나를 깊이별로 덮어쓰며 역추적 (분기마다 경로를 복사하지 않음)
+        path = [source] * (int(dist[target]) + 1)
+        stack = [(target, len(path) - 1)]
+        while stack:
+            node, depth = stack.pop()
+            path[depth] = node
+            if depth == 0:
+                yield list(path)
+                continue
+            parents = self.parents(node)
+            parents = parents[dist[parents] == depth - 1]
+            stack.extend((parent, depth - 1) for parent in parents[::-1].tolist())
+
+    def all_shortest_paths(self, source, target):
+        if source not in self.ids:
+            raise nx.NodeNotFound(f'Source {source} is not in G')
+        if target not in self.ids:
+            raise nx.NodeNotFound(f'Target {target} is not in G')
+        names = self.names
+        for path in self.iter_shortest_path_ids(self.ids[source], self.ids[target]):
+            yield [names[node] for node in path]
+
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.level, self.on, self.out_indptr, self.out_indices,
+                                                self.in_indptr, self.in_indices))
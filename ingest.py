@@ -0,0 +1,244 @@
+import argparse
+from collections import namedtuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+# 장비 목록에 반드시 있어야 하는 열
+REQUIRED_COLUMNS = ['레벨', '장비 이름', '부모 장비']
+# 한 번에 읽어 검증/그래프 생성에 넘기는 행 수
+CHUNK_SIZE = 50000
+# 오류 출력 시 종류별로 보여줄 최대 건수
+REPORT_LIMIT = 20
+
+# 검증 결과 한 건: 엑셀 행 번호(머리글이 1행), 종류, 내용
+Issue = namedtuple('Issue', ['row', 'kind', 'message'])
+# 같은 장비 이름이 여러 행에 있는 경우는 기존 동작(마지막 행 기준)대로 처리하므로 경고로만 보고
+WARNING_KINDS = {'duplicate'}
+
+class RegisterError(ValueError):
+    def __init__(self, issues):
+        self.issues = issues
+        super().__init__('\n'.join(format_issue(issue) for issue in issues[:REPORT_LIMIT]))
+
+def format_issue(issue):
+    return f'{issue.row}행 [{issue.kind}] {issue.message}' if issue.row else f'[{issue.kind}] {issue.message}'
+
+# openpyxl 읽기 전용 모드로 시트를 행 단위로 읽어 chunksize 행씩 DataFrame으로 생성
+# 청크의 인덱스는 엑셀 행 번호 (빈 행은 건너뜀) / 필수 열이 없으면 RegisterError
+def iter_chunks(excel_path, chunksize=CHUNK_SIZE, sheet_name=None):
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        columns = [str(value).strip() if value is not None else '' for value in header]
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise RegisterError([Issue(1, 'schema', f"필수 열이 없습니다: {', '.join(missing)}")])
+        keep = [i for i, column in enumerate(columns) if column]
+        names = [columns[i] for i in keep]
+
+        buffer, numbers = [], []
+        for number, values in enumerate(rows, start=2):
+            values = [values[i] if i < len(values) else None for i in keep]
+            if all(value is None for value in values):
+                continue
+            buffer.append(values)
+            numbers.append(number)
+            if len(buffer) == chunksize:
+                yield pd.DataFrame(buffer, columns=names, index=numbers)
+                buffer, numbers = [], []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=names, index=numbers)
+    finally:
+        workbook.close()
+
+# 청크 단위 검증: 이름/레벨 값, 중복 장비 이름, 없는 부모 장비, 레벨 역전(부모 레벨 >= 자식 레벨), 순환
+# 부모 장비가 뒤에 나오는 행에 정의될 수 있으므로 없는 부모 장비는 끝까지 읽은 뒤 확정
+class RegisterValidator:
+    def __init__(self):
+        self.issues = []
+        # 장비 이름 -> (처음 나온 행 번호, 레벨)
+        self.seen = {}
+        # 아직 정의되지 않은 부모 장비 -> [(자식 행 번호, 자식 이름, 자식 레벨)]
+        self.pending = {}
+        # 레벨이 역전된 간선 (순환 후보)
+        self.backward = []
+
+    def check(self, chunk):
+        names = chunk['장비 이름']
+        levels = pd.to_numeric(chunk['레벨'], errors='coerce')
+        parents = chunk['부모 장비']
+        seen, pending, issues = self.seen, self.pending, self.issues
+        valid = np.ones(len(chunk), dtype=bool)
+
+        for offset, (row, name, level, raw_level, parent_text) in enumerate(
+                zip(chunk.index.tolist(), names.tolist(), levels.tolist(), chunk['레벨'].tolist(), parents.tolist())):
+            if pd.isna(name) or not str(name).strip():
+                issues.append(Issue(row, 'name', '장비 이름이 비어 있습니다'))
+                valid[offset] = False
+                continue
+            name = str(name).strip()
+            if level != level:
+                issues.append(Issue(row, 'level', f'{name}: 레벨 값이 숫자가 아닙니다 ({raw_level!r})'))
+                valid[offset] = False
+                continue
+
+            if name in seen:
+                issues.append(Issue(row, 'duplicate', f'{name}: {seen[name][0]}행과 장비 이름이 중복됩니다'))
+            else:
+                seen[name] = (row, level)
+                # 앞에서 이 장비를 부모로 참조한 행들의 레벨 확인
+                for child_row, child, child_level in pending.pop(name, ()):
+                    self._check_level(child_row, name, level, child, child_level)
+
+            if parent_text is None or (isinstance(parent_text, float) and parent_text != parent_text):
+                continue
+            for parent in str(parent_text).split(','):
+                parent = parent.strip()
+                if not parent:
+                    continue
+                if parent in seen:
+                    self._check_level(row, parent, seen[parent][1], name, level)
+                else:
+                    pending.setdefault(parent, []).append((row, name, level))
+        return valid
+
+    def _check_level(self, row, parent, parent_level, child, child_level):
+        if parent_level >= child_level:
+            self.issues.append(Issue(row, 'monotonic',
+                                     f'{child}(레벨 {child_level:g})의 부모 {parent}(레벨 {parent_level:g})가 같거나 낮은 계층입니다'))
+            self.backward.append((row, parent, child))
+
+    # 끝까지 읽은 뒤: 정의되지 않은 부모 장비와 순환 확정
+    # 순환은 레벨이 역전된 간선을 반드시 하나 이상 포함하므로 그런 간선이 있을 때만 그래프로 확인
+    def finish(self, edges=None):
+        for parent, refs in self.pending.items():
+            for row, child, _ in refs:
+                self.issues.append(Issue(row, 'dangling', f'{child}의 부모 장비 {parent}가 목록에 없습니다'))
+        self.pending = {}
+        if self.backward and edges is not None:
+            G = nx.DiGraph(edges)
+            reported = set()
+            for row, parent, child in self.backward:
+                if parent == child:
+                    self.issues.append(Issue(row, 'cycle', f'{child}가 자기 자신을 부모로 참조합니다'))
+                elif G.has_node(child) and nx.has_path(G, child, parent):
+                    cycle = nx.shortest_path(G, child, parent)
+                    if frozenset(cycle) not in reported:
+                        reported.add(frozenset(cycle))
+                        self.issues.append(Issue(row, 'cycle', ' -> '.join(cycle + [child])))
+        self.issues.sort(key=lambda issue: issue.row)
+        return self.issues
+
+    def errors(self):
+        return [issue for issue in self.issues if issue.kind not in WARNING_KINDS]
+
+# 검증된 청크를 받아 이름 사전과 행별 부모 CSR 배열을 이어 붙이는 그래프 입력 생성기
+# (CSRTopology.from_arrays 입력과 같은 형태, keep_frame=False면 DataFrame용 열을 보관하지 않음)
+# keep_frame=True면 청크 DataFrame 대신 열별 값 배열만 보관하고, frame()에서 열 하나씩 이어 붙이며 청크 배열을 버림
+# -> 읽는 동안 최대 메모리는 최종 DataFrame + 열 하나 분량
+class RegisterBuilder:
+    def __init__(self, keep_frame=True):
+        self.ids = {}
+        self.row_name, self.level, self.status = [], [], []
+        self.parent_counts, self.parent_indices = [], []
+        self.columns = {} if keep_frame else None
+
+    def _intern(self, names):
+        ids = self.ids
+        return np.fromiter((ids.setdefault(name, len(ids)) for name in names), dtype=np.int64, count=len(names))
+
+    def add(self, chunk):
+        names = chunk['장비 이름'].astype(str).str.strip()
+        # 빈 칸은 pandas 버전에 따라 None/NaN으로 읽히므로 pd.isna로 판정
+        split = [[] if pd.isna(text) else [p.strip() for p in str(text).split(',') if p.strip()]
+                 for text in chunk['부모 장비'].tolist()]
+        self.row_name.append(self._intern(names.tolist()))
+        self.level.append(chunk['레벨'].to_numpy())
+        self.status.append(chunk['상태'].to_numpy(dtype=object) if '상태' in chunk else np.full(len(chunk), 'on', dtype=object))
+        self.parent_counts.append(np.fromiter(map(len, split), dtype=np.int64, count=len(split)))
+        self.parent_indices.append(self._intern([p for group in split for p in group]))
+        if self.columns is not None:
+            # 청크의 블록을 붙잡지 않도록 열마다 복사해 보관
+            for column in chunk.columns:
+                values = names if column == '장비 이름' else chunk[column]
+                self.columns.setdefault(column, []).append(values.to_numpy(copy=True))
+
+    # name_table, row_name, level, status, parent_indptr, parent_indices
+    def arrays(self):
+        name_table = np.empty(len(self.ids), dtype=object)
+        name_table[:] = list(self.ids)
+        counts = np.concatenate(self.parent_counts) if self.parent_counts else np.zeros(0, dtype=np.int64)
+        concat = lambda parts, dtype=None: np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+        return (name_table, concat(self.row_name, np.int64), concat(self.level, np.int64),
+                concat(self.status, object), np.concatenate([[0], np.cumsum(counts)]), concat(self.parent_indices, np.int64))
+
+    # 검증 단계의 순환 확인용 (부모, 자식) 이름 쌍
+    def edges(self):
+        name_table, row_name, _, _, indptr, indices = self.arrays()
+        child = np.repeat(row_name, np.diff(indptr))
+        return zip(name_table[indices].tolist(), name_table[child].tolist())
+
+    # 보관한 열을 하나씩 이어 붙여 (열 이름, Series)로 내보내고 해당 열의 청크 배열은 바로 버림
+    # 레벨이 모두 정수이면 정수 열로 (openpyxl은 숫자를 float로 읽음), 상태 열이 없으면 모두 'on'
+    def iter_columns(self):
+        rows = sum(len(ids) for ids in self.row_name)
+        has_status = '상태' in self.columns
+        for column in list(self.columns):
+            series = pd.concat([pd.Series(part) for part in self.columns.pop(column)], ignore_index=True)
+            if column == '레벨':
+                levels = pd.to_numeric(series)
+                series = levels.astype(np.int64) if (levels == levels.round()).all() else levels
+            yield column, series
+        if not has_status:
+            yield '상태', pd.Series(['on'] * rows)
+
+    def frame(self):
+        if not self.columns:
+            return pd.DataFrame(columns=REQUIRED_COLUMNS + ['상태'])
+        return pd.DataFrame(dict(self.iter_columns()))
+
+# 엑셀 장비 목록을 청크 단위로 읽으면서 검증하고 그래프 입력을 만듦
+# 이름/레벨이 잘못된 행은 건너뛰고, strict=True면 오류가 하나라도 있을 때 RegisterError
+def stream_register(excel_path, chunksize=CHUNK_SIZE, strict=False, keep_frame=True):
+    validator = RegisterValidator()
+    builder = RegisterBuilder(keep_frame=keep_frame)
+    for chunk in iter_chunks(excel_path, chunksize):
+        valid = validator.check(chunk)
+        chunk = chunk[valid]
+        chunk = chunk.assign(레벨=pd.to_numeric(chunk['레벨']))
+        builder.add(chunk)
+    validator.finish(builder.edges() if validator.backward else None)
+    if strict and validator.errors():
+        raise RegisterError(validator.errors())
+    return builder, validator.issues
+
+# 종류별 건수와 앞쪽 몇 건을 출력
+def print_issues(issues, limit=REPORT_LIMIT):
+    if not issues:
+        return
+    counts = pd.Series([issue.kind for issue in issues]).value_counts()
+    print('장비 목록 검증: ' + ', '.join(f'{kind} {count}건' for kind, count in counts.items()))
+    for issue in issues[:limit]:
+        print('  ' + format_issue(issue))
+    if len(issues) > limit:
+        print(f'  ... 외 {len(issues) - limit}건')
+
+def main():
+    parser = argparse.ArgumentParser(description='엑셀 장비 목록 검증')
+    parser.add_argument('excel_path')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--limit', type=int, default=REPORT_LIMIT, help='출력할 최대 건수')
+    args = parser.parse_args()
+    builder, issues = stream_register(args.excel_path, args.chunksize, keep_frame=False)
+    print(f'{len(builder.ids)}개 이름, {sum(len(ids) for ids in builder.row_name)}행')
+    print_issues(issues, args.limit)
+    errors = [issue for issue in issues if issue.kind not in WARNING_KINDS]
+    raise SystemExit(1 if errors else 0)
+
+if __name__ == '__main__':
+    main()
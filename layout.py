@@ -1,29 +1,125 @@
-from dash import dcc, html
+import uuid
+
+from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
 
+from table_query import LEVEL, NAME, STATUS, TOGGLE, PAGE_SIZE
+
+# 브라우저가 서버의 토폴로지 버전을 확인하는 주기(밀리초)
+RELOAD_CHECK_MS = 5000
+# 화면에서 실행하는 두 장비 동시 정지 분석의 조합 후보 상한 (계산량이 후보 수의 제곱에 비례)
+PAIR_MAX_CANDIDATES = 200
+
 def create_layout(app):
     return html.Div([
+        # 브라우저 탭마다 고유한 세션 id (장비 상태 변경분은 서버에 세션별로 저장)
+        dcc.Store(id='session-id', storage_type='session', data=str(uuid.uuid4())),
         dcc.Graph(id='equipment-graph'),
+        # 그림을 그린 토폴로지 버전과 서버의 최신 버전 (장비 목록을 다시 읽으면 그림/테이블 갱신)
+        dcc.Store(id='topology-version'),
+        dcc.Store(id='topology-latest'),
+        dcc.Interval(id='reload-check', interval=RELOAD_CHECK_MS),
         html.Div(id='selected-node', style={'display': 'none'}),
         html.Div([
             dcc.Input(id='start-node', type='text', placeholder='Start Node', style={'margin-right': '10px'}),
             dcc.Input(id='end-node', type='text', placeholder='End Node', style={'margin-right': '10px'}),
             html.Button('Find Path', id='find-path', n_clicks=0, style={'margin-right': '10px'}),
+            html.Button('탐색 취소', id='cancel-search', n_clicks=0, disabled=True, style={'margin-right': '10px'}),
             dcc.Dropdown(
                 id='filter-dropdown',
-                options=[{'label': '특정 노드 포함 필터', 'value': 'node'}],
+                options=[{'label': '특정 노드 포함 필터', 'value': 'node'},
+                         {'label': '특정 노드 제외 필터', 'value': 'avoid'}],
                 placeholder='필터 조건 선택',
                 style={'width': '300px', 'margin-right': '10px'}
             ),
-            dcc.Input(id='filter-input', type='text', placeholder='필터 값 입력', style={'margin-right': '10px'}),
+            dcc.Input(id='filter-input', type='text', placeholder='필터 값 입력 (여러 개는 쉼표로 구분)', style={'margin-right': '10px'}),
             html.Button('출력', id='output-button', n_clicks=0, style={'margin-right': '10px'}),
             html.Button('주장비 우선 정렬', id='sort-priority-button', n_clicks=0, style={'margin-right': '10px'}),
-            html.Button('단거리 우선 정렬', id='sort-shortest-button', n_clicks=0)
+            html.Button('단거리 우선 정렬', id='sort-shortest-button', n_clicks=0, style={'margin-right': '10px'}),
+            html.Button('비용 우선 정렬', id='sort-cost-button', n_clicks=0, style={'margin-right': '10px'}),
+            # 이 레벨 아래의 장비는 묶음 노드로 접어서 표시 (비우면 전체 표시, 노드를 클릭하면 펼침/접기)
+            dcc.Input(id='lod-level', type='number', min=1, placeholder='접기 레벨', debounce=True, style={'width': '100px'})
         ], style={'display': 'flex', 'align-items': 'center', 'flex-wrap': 'wrap', 'margin-bottom': '20px'}),
+        # 상세 수준 모드에서 펼친 장비 목록
+        dcc.Store(id='expanded-nodes', data=[]),
+        # 드롭다운 목록을 만든 경로 검색 조건 (시작, 끝, 필터, 정렬)
+        dcc.Store(id='path-query'),
+        # 드롭다운에 올라간 경로 목록 (탐색 중에는 부분 결과)
+        dcc.Store(id='path-results'),
         dcc.Dropdown(id='path-dropdown', options=[], placeholder='Select a path', style={'margin-bottom': '10px', 'width': '100%'}),
         html.Div(id='path-output'),
         html.Div(id='path-count', style={'margin-bottom': '20px'}),
-        html.Div(id='controls', children=[]),
+        html.Button('통전 부하 보기', id='energized-button', n_clicks=0, style={'margin-bottom': '10px'}),
+        html.Div(id='energized-loads', style={'margin-bottom': '20px'}),
+        # 시나리오: 현재 상태를 이름을 붙여 저장(분기)하고, 적용/삭제하거나 현재 상태와 비교
+        html.Div([
+            dcc.Input(id='scenario-name', type='text', placeholder='시나리오 이름', style={'margin-right': '10px'}),
+            html.Button('시나리오 저장', id='scenario-fork', n_clicks=0, style={'margin-right': '10px'}),
+            dcc.Dropdown(id='scenario-dropdown', options=[], multi=True, placeholder='시나리오 선택',
+                         style={'width': '300px', 'margin-right': '10px'}),
+            html.Button('적용', id='scenario-apply', n_clicks=0, style={'margin-right': '10px'}),
+            html.Button('삭제', id='scenario-discard', n_clicks=0, style={'margin-right': '10px'}),
+            html.Button('시나리오 비교', id='scenario-compare', n_clicks=0, style={'margin-right': '10px'}),
+        ], style={'display': 'flex', 'align-items': 'center', 'margin-bottom': '10px'}),
+        # 시나리오를 적용하면 값이 바뀌어 그래프와 제어 테이블을 다시 그림
+        dcc.Store(id='scenario-applied', data=0),
+        html.Div(id='scenario-status', style={'margin-bottom': '10px'}),
+        html.Div(id='scenario-progress', style={'margin-bottom': '10px'}),
+        dash_table.DataTable(
+            id='scenario-table',
+            columns=[{'name': column, 'id': column} for column in
+                     ['시나리오', '변경 장비 수', '정전 부하 수', '추가 정전 부하 수', '복구 부하 수', '연결 가능 쌍', '추가 정전 부하', '복구 부하']],
+            data=[], page_size=10, style_cell={'textAlign': 'center'}),
+        dash_table.DataTable(
+            id='scenario-pair-table',
+            columns=[{'name': column, 'id': column} for column in
+                     ['시나리오', '시작', '끝', '연결 가능', '변화', '유지 경로 수', '기준 경로 수', '최선 경로 비용', '기준 최선 경로 비용', '최선 경로']],
+            data=[], page_size=10, style_cell={'textAlign': 'center'}),
+        html.Div(style={'margin-bottom': '20px'}),
+        # 장비 정지 분석: 장비별로 off 시 공급을 잃는 부하 수 (백그라운드 작업)
+        html.Div([
+            html.Button('정지 분석', id='contingency-button', n_clicks=0, style={'margin-right': '10px'}),
+            html.Button('분석 취소', id='cancel-contingency', n_clicks=0, disabled=True, style={'margin-right': '10px'}),
+            dcc.Checklist(id='contingency-pairs', options=[{'label': ' 두 장비 동시 정지 포함', 'value': 'pairs'}],
+                          value=[], inline=True, style={'margin-right': '10px'}),
+            dcc.Input(id='contingency-pair-level', type='number', min=0, placeholder='조합 후보 최대 레벨',
+                      style={'margin-right': '10px'}),
+            html.Span(f'조합 후보: 차단 부하가 많은 장비부터 최대 {PAIR_MAX_CANDIDATES}개'),
+        ], style={'display': 'flex', 'align-items': 'center', 'margin-bottom': '10px'}),
+        html.Div(id='contingency-progress', style={'margin-bottom': '10px'}),
+        dash_table.DataTable(
+            id='contingency-table',
+            columns=[{'name': column, 'id': column} for column in ['장비 이름', '레벨', '차단 부하 수', '차단 비율', '차단 부하']],
+            data=[], page_size=10, sort_action='native', style_cell={'textAlign': 'center'}),
+        dash_table.DataTable(
+            id='contingency-pair-table',
+            columns=[{'name': column, 'id': column} for column in ['장비 1', '장비 2', '차단 부하 수', '추가 차단 부하 수']],
+            data=[], page_size=10, sort_action='native', style_cell={'textAlign': 'center'}),
+        html.Div(style={'margin-bottom': '20px'}),
+        # 장비 제어 테이블: 현재 페이지의 행만 서버에서 조회 ('토글' 칸을 누르면 상태 변경)
+        html.Div(id='controls', children=[
+            dash_table.DataTable(
+                id='equipment-table',
+                columns=[{'name': LEVEL, 'id': LEVEL, 'type': 'numeric'},
+                         {'name': NAME, 'id': NAME},
+                         {'name': STATUS, 'id': STATUS},
+                         {'name': '토글 버튼', 'id': TOGGLE}],
+                page_current=0,
+                page_size=PAGE_SIZE,
+                page_action='custom',
+                filter_action='custom',
+                filter_query='',
+                sort_action='custom',
+                sort_mode='single',
+                sort_by=[],
+                style_cell={'textAlign': 'center'},
+                style_data_conditional=[
+                    {'if': {'filter_query': '{%s} = "on"' % STATUS, 'column_id': STATUS}, 'color': 'red'},
+                    {'if': {'filter_query': '{%s} = "off"' % STATUS, 'column_id': STATUS}, 'color': 'green'},
+                    {'if': {'column_id': TOGGLE}, 'cursor': 'pointer', 'fontWeight': 'bold'},
+                ],
+            ),
+        ]),
         dbc.Modal(
             [
                 dbc.ModalHeader(dbc.ModalTitle("경로 정보")),
@@ -0,0 +1,39 @@
+import numpy as np
+
+# 상세 수준(LOD) 그래프: 접기 레벨 이하의 장비와 펼친 장비의 자식만 개별 노드로 표시하고,
+# 그 아래 하위 장비는 경계(frontier) 노드의 on/off 개수로 묶어 보여줌
+
+# 보이는 장비 목록 (레벨 순): 접기 레벨 이하 장비 + 펼친 장비에서 이어지는 자식
+def visible_nodes(topology, collapse_level, expanded):
+    expanded = set(expanded or ())
+    hi = np.searchsorted(topology.table_levels, collapse_level, 'right')
+    visible = dict.fromkeys(topology.by_level[:hi])
+    stack = [node for node in visible if node in expanded]
+    while stack:
+        node = stack.pop()
+        for child in topology.base.successors(node):
+            if child not in visible:
+                visible[child] = None
+                if child in expanded:
+                    stack.append(child)
+    return list(visible)
+
+# 경계 노드별로 숨겨진 하위 장비의 (on 개수, off 개수)를 계산 (경계 노드만 계산)
+# 하위 장비 집합은 토폴로지에 캐시되므로 같은 장비 목록에서는 처음 한 번만 구함
+def aggregate_counts(topology, visible, off):
+    visible = set(visible)
+    counts = {}
+    for node in visible:
+        if all(child in visible for child in topology.base.successors(node)):
+            continue
+        hidden = topology.descendants(node) - visible
+        off_count = sum(1 for child in off if child in hidden) if len(off) < len(hidden) \
+            else sum(1 for child in hidden if child in off)
+        counts[node] = (len(hidden) - off_count, off_count)
+    return counts
+
+def node_label(node, counts):
+    if node not in counts:
+        return node
+    on_count, off_count = counts[node]
+    return f'{node} (+{on_count + off_count}: on {on_count} / off {off_count})'
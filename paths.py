@@ -0,0 +1,126 @@
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import networkx as nx
+
+from csr import CSRTopology
+
+# 드롭다운에 올릴 최대 경로 수
+TOP_K = 50
+# 정렬을 위해 살펴볼 최대 경로 수 (조합 폭발 방지)
+SCAN_LIMIT = 10000
+
+# networkx 그래프와 CSR 저장소 모두에서 최단 경로를 하나씩 생성
+def iter_shortest_paths(G, start, end):
+    if isinstance(G, CSRTopology):
+        return G.all_shortest_paths(start, end)
+    return nx.all_shortest_paths(G, source=start, target=end)
+
+# 시작/끝 장비 사이의 최단 경로를 필요한 만큼만 생성하고 상위 K개를 고름
+# sort: None(탐색 순서), 'shortest'(길이 순), 'priority'(score가 큰 순)
+# 탐색 도중 결과를 내보내는 iter_search_paths를 끝까지 돌린 최종 결과 (앱과 같은 탐색 코드)
+def search_paths(G, start, end, must_include=None, sort=None, score=None, k=TOP_K, limit=SCAN_LIMIT):
+    for _, paths in iter_search_paths(G, start, end, must_include, sort, score, k, limit, interval=math.inf):
+        pass
+    if not paths:
+        raise nx.NetworkXNoPath(f'No path between {start} and {end}.')
+    return paths
+
+# 상위 K개 경로를 탐색하면서 interval초마다 (살펴본 경로 수, 현재 상위 K개)로 내보내고
+# 마지막에는 최종 결과를 한 번 더 내보냄 (백그라운드 콜백의 진행 상황/부분 결과용)
+def iter_search_paths(G, start, end, must_include=None, sort=None, score=None, k=TOP_K, limit=SCAN_LIMIT, interval=0.5):
+    # 필터로 걸러지는 경로도 살펴본 수에 넣어야 탐색이 limit에서 멈춤
+    paths = itertools.islice(iter_shortest_paths(G, start, end), limit)
+    if must_include:
+        paths = (path for path in paths if must_include in path)
+
+    # all_shortest_paths가 내는 경로는 모두 길이가 같으므로 길이 순 정렬은 탐색 순서와 같음 -> K개를 찾는 즉시 멈춤
+    # 우선순위 정렬은 (점수, -탐색 순서) 최소 힙으로 상위 K개 유지 (동점은 탐색 순서 유지)
+    def ranked():
+        if sort != 'priority':
+            return list(found)
+        return [path for _, _, path in sorted(found, key=lambda item: (-item[0], -item[1]))]
+
+    found = []
+    scanned = 0
+    deadline = time.monotonic() + interval
+    for path in paths:
+        scanned += 1
+        if sort != 'priority':
+            found.append(path)
+            if len(found) == k:
+                break
+        elif len(found) < k:
+            heapq.heappush(found, (score(path), -scanned, path))
+        else:
+            heapq.heappushpop(found, (score(path), -scanned, path))
+        if time.monotonic() >= deadline:
+            yield scanned, ranked()
+            deadline = time.monotonic() + interval
+    yield scanned, ranked()
+
+# 프로세스 사이에서 같은 조회를 같은 키로 찾도록 집합/튜플을 정렬된 목록으로 바꿔 해시
+def shared_key(key):
+    version, off, *query = key
+    text = json.dumps([version, sorted(map(str, off)), *query], ensure_ascii=False, default=list)
+    return 'path:' + hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+# (토폴로지 버전, 상태 스냅샷, 시작, 끝, 필터, 정렬)별 검색 결과를 보관하는 LRU 캐시
+# 그래프 콜백과 경로 정보 모달이 같은 결과를 공유 (탐색은 Workspace.search가 하고 결과만 보관)
+# reachability(ReachabilityIndex)가 있으면 경로가 없는 조합은 탐색 없이 바로 판정
+# shared(diskcache.Cache 등 get/set 지원)가 있으면 결과를 함께 기록해
+# 백그라운드 작업 프로세스에서 탐색한 결과를 웹 프로세스(와 다른 작업자)에서도 찾음
+class PathCache:
+    def __init__(self, maxsize=128, reachability=None, shared=None):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.reachability = reachability
+        self.shared = shared
+        # Dash 작업 스레드가 함께 쓰므로 LRU 조회/갱신은 잠금 안에서
+        self.lock = threading.Lock()
+
+    # 필터 장비(하나 또는 여러 개)가 있으면 시작 -> 각 필터 장비 -> 끝이 모두 이어져야 함
+    def feasible(self, topology, start, end, must_include=None):
+        waypoints = (must_include,) if isinstance(must_include, str) else tuple(must_include or ())
+        return self._reachable(topology, start, end) and all(
+            self._reachable(topology, start, node) and self._reachable(topology, node, end) for node in waypoints)
+
+    # 캐시에 있는 결과만 조회 (없으면 None)
+    def get(self, topology, start, end, must_include=None, sort=None, must_avoid=None):
+        key = (topology.version, topology.status_key(), start, end, must_include, sort, must_avoid)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        if self.shared is None:
+            return None
+        paths = self.shared.get(shared_key(key))
+        if paths is not None:
+            self._remember(key, paths)
+        return paths
+
+    # 탐색을 직접 진행한 쪽(진행 상황을 보내는 백그라운드 작업 등)이 결과를 캐시에 넣을 때 사용
+    def store(self, topology, start, end, paths, must_include=None, sort=None, must_avoid=None):
+        key = (topology.version, topology.status_key(), start, end, must_include, sort, must_avoid)
+        self._remember(key, paths)
+        if self.shared is not None:
+            self.shared.set(shared_key(key), paths)
+
+    def _remember(self, key, paths):
+        with self.lock:
+            self.entries[key] = paths
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def _reachable(self, topology, start, end):
+        index = self.reachability
+        if index is None or index.version != topology.version or start not in index or end not in index:
+            return True
+        return index.has_path(start, end, topology.status_key())
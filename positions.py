@@ -0,0 +1,61 @@
+import numpy as np
+
+# 레벨별 다단 배치(nx.multipartite_layout과 같은 좌표계)를 캐시해 두고
+# 구성이 바뀐 레벨만 다시 배치하는 레이아웃 캐시
+class LayoutCache:
+    def __init__(self, subset_key='level'):
+        self.subset_key = subset_key
+        self.key = None
+        self.levels = {}    # 레벨 -> 해당 레벨 노드 튜플
+        self.columns = {}   # 레벨 -> 레벨 안에서의 y 좌표 (정규화 전)
+        self.nodes = []     # 좌표 배열의 행 순서
+        self.index = {}     # 노드 -> 좌표 배열의 행 번호
+        self.array = np.empty((0, 2))
+        self.pos = {}
+
+    def layout(self, G, key=None):
+        # 토폴로지 키가 같으면 노드 집합과 레벨이 그대로이므로 바로 재사용
+        if key is not None and key == self.key:
+            return self.pos
+
+        levels = {}
+        for node, level in G.nodes(data=self.subset_key):
+            levels.setdefault(level, []).append(node)
+        levels = {level: tuple(nodes) for level, nodes in levels.items()}
+
+        changed = [level for level, nodes in levels.items() if self.levels.get(level) != nodes]
+        removed = [level for level in self.levels if level not in levels]
+        if changed or removed:
+            for level in removed:
+                del self.columns[level]
+            # 노드가 추가되거나 빠진 레벨만 다시 배치
+            for level in changed:
+                height = len(levels[level])
+                self.columns[level] = np.arange(height, dtype=float) - (height - 1) / 2
+            self.levels = levels
+            self._assemble()
+        self.key = key
+        return self.pos
+
+    def _assemble(self):
+        order = sorted(self.levels)
+        width = len(order)
+        self.nodes = [node for level in order for node in self.levels[level]]
+        if not self.nodes:
+            self.index, self.array, self.pos = {}, np.empty((0, 2)), {}
+            return
+
+        xs = np.repeat(np.arange(width, dtype=float) - (width - 1) / 2,
+                       [len(self.levels[level]) for level in order])
+        ys = np.concatenate([self.columns[level] for level in order])
+        array = np.column_stack([xs, ys])
+
+        # nx.rescale_layout과 동일하게 중심을 맞추고 (-1, 1) 범위로 축소
+        array -= array.mean(axis=0)
+        lim = np.abs(array).max()
+        if lim > 0:
+            array /= lim
+
+        self.array = array
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.pos = dict(zip(self.nodes, array))
@@ -0,0 +1,187 @@
+import cProfile
+import io
+import itertools
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlparse, parse_qs
+
+from flask import Response, g, request
+
+# 단계별 소요 시간 히스토그램 구간 경계(초) (Prometheus histogram 형식)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# 보관할 최근 프로파일 수
+PROFILE_HISTORY = 20
+# 요청 측정과 /metrics, /debug/profile 경로, ?profile 전환을 켤지 여부 (PF_PROFILE=1, 기본값 꺼짐)
+# 누구나 콜백을 프로파일러로 실행하고 결과를 읽을 수 있으므로 외부에 열린 서버에서는 켜지 않음
+PROFILE_ENABLED = os.environ.get('PF_PROFILE', '0') not in ('', '0')
+# 페이지 주소나 요청 주소에 이 값이 있으면 해당 콜백 요청을 프로파일링 (?profile=1, ?profile=pyinstrument)
+PROFILE_FLAG = 'profile'
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+_lock = threading.Lock()
+# (지표 이름, 라벨 값) -> Histogram
+_histograms = {}
+_profiles = deque(maxlen=PROFILE_HISTORY)
+_profile_ids = itertools.count(1)
+
+def observe(metric, label, seconds):
+    with _lock:
+        _histograms.setdefault((metric, label), Histogram()).observe(seconds)
+
+# 콜백 안의 단계 구간 측정: with span('layout'): ...
+@contextmanager
+def span(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe('pf_stage_seconds', stage, time.perf_counter() - start)
+
+# Prometheus 텍스트 형식 지표
+#   pf_stage_seconds{stage=...}: 콜백 안의 단계별 시간
+#   pf_callback_seconds{callback=...}: 콜백 요청 전체 시간 (Dash의 JSON 직렬화 포함)
+def metrics_text():
+    label_names = {'pf_stage_seconds': 'stage', 'pf_callback_seconds': 'callback'}
+    lines = []
+    with _lock:
+        items = sorted(_histograms.items())
+        for metric in sorted({metric for metric, _ in _histograms}):
+            lines.append(f'# TYPE {metric} histogram')
+            for (name, label), histogram in items:
+                if name != metric:
+                    continue
+                tag = f'{label_names[metric]}="{_escape(label)}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{tag},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{{tag}}} {histogram.total:.6f}')
+                lines.append(f'{metric}_count{{{tag}}} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# 단계별 요약 (평균 시간 순)
+def summary():
+    with _lock:
+        rows = [{'metric': metric, 'label': label, 'count': h.count, 'total': h.total,
+                 'mean': h.total / h.count if h.count else 0.0, 'max': h.max}
+                for (metric, label), h in _histograms.items()]
+    return sorted(rows, key=lambda row: -row['mean'])
+
+def _profile_mode():
+    mode = request.args.get(PROFILE_FLAG)
+    if mode is None and request.referrer:
+        mode = parse_qs(urlparse(request.referrer).query).get(PROFILE_FLAG, [None])[0]
+    return mode
+
+# 콜백 출력 id (allow_duplicate 출력에 붙는 해시는 제외)
+def _callback_name():
+    body = request.get_json(silent=True) or {}
+    return re.sub(r'@[0-9a-f]+', '', body.get('output', request.path))
+
+def _start_profile(mode):
+    if mode == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return 'pyinstrument', profiler
+        except ImportError:
+            pass
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return 'cprofile', profiler
+
+def _finish_profile(kind, profiler):
+    if kind == 'pyinstrument':
+        profiler.stop()
+        return profiler.output_text(unicode=True)
+    profiler.disable()
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(40)
+    return stream.getvalue()
+
+def _before_request():
+    if request.path.endswith('/_dash-update-component'):
+        g.pf_start = time.perf_counter()
+        mode = _profile_mode()
+        if mode and mode != '0':
+            g.pf_profile = _start_profile(mode)
+
+def _after_request(response):
+    start = g.pop('pf_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    name = _callback_name()
+    observe('pf_callback_seconds', name, elapsed)
+    profile = g.pop('pf_profile', None)
+    if profile is not None:
+        report = _finish_profile(*profile)
+        with _lock:
+            _profiles.appendleft({'id': next(_profile_ids), 'callback': name, 'seconds': elapsed,
+                                  'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'kind': profile[0], 'report': report})
+    return response
+
+def _metrics_route():
+    return Response(metrics_text(), mimetype='text/plain; version=0.0.4')
+
+# 단계별 요약과 최근 프로파일 목록 (?id=N이면 해당 프로파일 전체, ?format=json이면 JSON)
+def _profile_route():
+    with _lock:
+        profiles = list(_profiles)
+    if request.args.get('id'):
+        for profile in profiles:
+            if str(profile['id']) == request.args['id']:
+                return Response(profile['report'], mimetype='text/plain')
+        return Response('프로파일이 없습니다\n', status=404, mimetype='text/plain')
+
+    stages = summary()
+    if request.args.get('format') == 'json':
+        listing = [{key: value for key, value in profile.items() if key != 'report'} for profile in profiles]
+        return Response(json.dumps({'stages': stages, 'profiles': listing}, ensure_ascii=False),
+                        mimetype='application/json')
+
+    lines = [f"{'metric':<22} {'label':<50} {'count':>7} {'mean(s)':>9} {'max(s)':>9} {'total(s)':>10}"]
+    for row in stages:
+        lines.append(f"{row['metric']:<22} {str(row['label'])[:50]:<50} {row['count']:>7} "
+                     f"{row['mean']:>9.4f} {row['max']:>9.4f} {row['total']:>10.3f}")
+    lines.append('')
+    lines.append(f'최근 프로파일 (페이지 주소에 ?{PROFILE_FLAG}=1 또는 ?{PROFILE_FLAG}=pyinstrument를 붙여 수집)')
+    for profile in profiles:
+        lines.append(f"  id={profile['id']} {profile['time']} {profile['kind']} {profile['seconds']:.3f}s {profile['callback']}")
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain')
+
+# Flask 서버에 요청 단위 측정과 /metrics, /debug/profile 경로를 등록 (enabled가 False면 아무것도 등록하지 않음)
+def install(server, enabled=PROFILE_ENABLED):
+    if not enabled:
+        return
+    server.before_request(_before_request)
+    server.after_request(_after_request)
+    server.add_url_rule('/metrics', 'pf_metrics', _metrics_route)
+    server.add_url_rule('/debug/profile', 'pf_debug_profile', _profile_route)
@@ -0,0 +1,188 @@
+import os
+import threading
+from collections import OrderedDict, deque
+
+import networkx as nx
+import numpy as np
+
+from csr import ranges
+
+# 비트셋 색인을 만드는 최대 장비 수 (넘으면 BFS로 판정)
+# 메모리는 장비 수 N에 대해 N * N / 8 바이트 (2만 개 약 50MB, 10만 개 약 1.25GB)
+REACH_MAX_NODES = int(os.environ.get('PF_REACH_MAX_NODES', '20000'))
+
+# 장비별 하위 도달 집합을 uint64 비트셋으로 미리 계산해 둔 도달 가능성 색인
+#   bits[i]: on 장비만 지나서 장비 i에서 도달할 수 있는 장비 집합 (자기 자신 포함, off 장비는 빈 집합)
+#   장비 번호는 위상 정렬 순서 -> 자식 비트셋을 먼저 계산한 뒤 부모에 OR
+# 비트셋은 장비 목록의 상태(off) 기준으로 처음 조회할 때 한 번만 만들고 이후 바꾸지 않음
+# 세션/시나리오의 off 장비 집합은 바뀐 장비와 그 상위 장비의 비트셋만 따로 계산해 덧씌움 (상태별 LRU)
+# 장비 수가 REACH_MAX_NODES를 넘거나 순환 연결이 있으면 색인 없이 on 장비만 따라가는 BFS로 판정
+class ReachabilityIndex:
+    def __init__(self, base, off=(), version=None, max_nodes=REACH_MAX_NODES, overlays=16):
+        self.base = base
+        self.version = version
+        self.base_off = frozenset(node for node in off if node in base)
+        self.max_nodes = max_nodes
+        self.bits = None
+        self.fallback = None
+        self.lock = threading.Lock()
+        self.overlays = OrderedDict()
+        self.max_overlays = overlays
+        self.overlay_bytes = 0
+        self.overlay_lock = threading.Lock()
+
+    def __contains__(self, node):
+        return node in self.base
+
+    # 처음 조회할 때 비트셋을 만듦 (여러 스레드가 동시에 조회해도 한 번만)
+    def _ensure(self):
+        if self.bits is not None or self.fallback is not None:
+            return
+        with self.lock:
+            if self.bits is not None or self.fallback is not None:
+                return
+            if len(self.base) > self.max_nodes:
+                self.fallback = f'장비 {len(self.base)}개 > {self.max_nodes}개'
+                return
+            try:
+                generations = [list(generation) for generation in nx.topological_generations(self.base)]
+            except nx.NetworkXUnfeasible:
+                self.fallback = '순환 연결'
+                print('도달 가능성 색인 생략: 장비 목록에 순환 연결이 있어 BFS로 판정합니다')
+                return
+            self._build(generations)
+
+    def _build(self, generations):
+        base = self.base
+        self.names = [node for generation in generations for node in generation]
+        self.ids = {node: i for i, node in enumerate(self.names)}
+        size = len(self.names)
+        self.generation = np.repeat(np.arange(len(generations)), [len(g) for g in generations])
+
+        # 부모 -> 자식 CSR (부모 번호 순)
+        edges = np.array([(self.ids[parent], self.ids[child]) for parent, child in base.edges()],
+                         dtype=np.int64).reshape(-1, 2)
+        edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+        self.indptr = np.searchsorted(edges[:, 0], np.arange(size + 1))
+        self.children = edges[:, 1]
+
+        # 부하(자식이 없는 장비)와 공급원(부모가 없는 장비)
+        self.words = (size + 63) // 64
+        self.load_mask = self._mask([i for i, node in enumerate(self.names) if base.out_degree(node) == 0])
+        self.sources = np.array([i for i, node in enumerate(self.names) if base.in_degree(node) == 0], dtype=np.int64)
+
+        ids = np.arange(size)
+        bits = np.zeros((size, self.words), dtype=np.uint64)
+        self._compute(ids, np.array([node not in self.base_off for node in self.names], dtype=bool), bits)
+        self.bits = bits
+
+    def _mask(self, ids):
+        mask = np.zeros(self.words, dtype=np.uint64)
+        ids = np.asarray(ids, dtype=np.int64)
+        np.bitwise_or.at(mask, ids >> 6, np.uint64(1) << (ids & 63).astype(np.uint64))
+        return mask
+
+    # ids(오름차순) 장비들의 비트셋을 위상 순서의 역순(세대 단위)으로 계산해 rows에 기록
+    # 자식 비트셋은 ids에 있으면 rows에서, 없으면 기준 비트셋에서 읽음
+    def _compute(self, ids, on, rows):
+        generation = self.generation[ids]
+        for depth in np.unique(generation)[::-1]:
+            selected = np.flatnonzero((generation == depth) & on)
+            if not len(selected):
+                continue
+            nodes = ids[selected]
+            rows[selected, nodes >> 6] = np.uint64(1) << (nodes & 63).astype(np.uint64)
+            starts = self.indptr[nodes]
+            counts = self.indptr[nodes + 1] - starts
+            selected, starts, counts = selected[counts > 0], starts[counts > 0], counts[counts > 0]
+            if not len(selected):
+                continue
+            child_bits = self._rows(ids, rows, self.children[ranges(starts, counts)])
+            rows[selected] |= np.bitwise_or.reduceat(child_bits, np.cumsum(counts) - counts, axis=0)
+
+    # 장비 번호 목록의 비트셋: 덧씌운 장비(ids, rows)는 덧씌운 값, 나머지는 기준 비트셋
+    def _rows(self, ids, rows, nodes):
+        if len(ids) == len(self.names):
+            return rows[nodes]
+        result = self.bits[nodes]
+        if len(ids):
+            position = np.minimum(np.searchsorted(ids, nodes), len(ids) - 1)
+            hit = ids[position] == nodes
+            result[hit] = rows[position[hit]]
+        return result
+
+    # off 장비 집합에 맞춰 기준 상태에서 바뀐 장비와 그 상위 장비의 비트셋만 새로 계산 (공유 색인은 그대로)
+    # 반환: (덧씌운 장비 번호 오름차순, 비트셋)
+    def _overlay(self, off):
+        off = frozenset(node for node in off if node in self.ids)
+        changed = off ^ self.base_off
+        if not changed:
+            return np.empty(0, dtype=np.int64), self.bits[:0]
+        with self.overlay_lock:
+            overlay = self.overlays.get(off)
+            if overlay is not None:
+                self.overlays.move_to_end(off)
+                return overlay
+
+        affected = set(changed)
+        for node in changed:
+            affected |= nx.ancestors(self.base, node)
+        ids = np.array(sorted(self.ids[node] for node in affected), dtype=np.int64)
+        on = np.array([self.names[i] not in off for i in ids.tolist()], dtype=bool)
+        rows = np.zeros((len(ids), self.words), dtype=np.uint64)
+        self._compute(ids, on, rows)
+        overlay = (ids, rows)
+
+        # 덧씌운 비트셋의 합이 기준 비트셋 크기를 넘지 않도록 오래된 상태부터 버림
+        with self.overlay_lock:
+            if off not in self.overlays:
+                self.overlays[off] = overlay
+                self.overlay_bytes += rows.nbytes
+            while self.overlays and (len(self.overlays) > self.max_overlays or self.overlay_bytes > self.bits.nbytes):
+                _, (_, dropped) = self.overlays.popitem(last=False)
+                self.overlay_bytes -= dropped.nbytes
+        return overlay
+
+    def _unpack(self, mask):
+        flags = np.unpackbits(mask.view(np.uint8), bitorder='little')[:len(self.names)]
+        return [self.names[i] for i in np.flatnonzero(flags).tolist()]
+
+    # 색인 없이 on 장비만 따라가는 BFS로 도달한 장비 집합
+    def _search(self, sources, off):
+        seen = {node for node in sources if node not in off}
+        queue = deque(seen)
+        while queue:
+            for child in self.base.successors(queue.popleft()):
+                if child not in seen and child not in off:
+                    seen.add(child)
+                    queue.append(child)
+        return seen
+
+    # 시작 장비에서 끝 장비까지 on 장비만 지나는 경로가 있는지 (비트 하나 확인)
+    # off: 장비 off 집합 (없으면 장비 목록의 상태)
+    def has_path(self, start, end, off=None):
+        self._ensure()
+        off = self.base_off if off is None else off
+        if self.fallback is not None:
+            return end in self._search([start], off)
+        ids, rows = self._overlay(off)
+        source, target = self.ids[start], self.ids[end]
+        word = self._rows(ids, rows, np.array([source]))[0, target >> 6]
+        return bool((word >> np.uint64(target & 63)) & np.uint64(1))
+
+    # 공급원에서 도달 가능한 부하(통전 부하)와 그렇지 않은 부하(정전 부하)
+    def energized_loads(self, off=None, sources=None):
+        self._ensure()
+        off = self.base_off if off is None else off
+        if self.fallback is not None:
+            base = self.base
+            if sources is None:
+                sources = [node for node in base if base.in_degree(node) == 0]
+            reached = self._search(sources, off)
+            loads = [node for node in base if base.out_degree(node) == 0]
+            return [node for node in loads if node in reached], [node for node in loads if node not in reached]
+        ids, rows = self._overlay(off)
+        sources = self.sources if sources is None else np.array([self.ids[node] for node in sources], dtype=np.int64)
+        reached = np.bitwise_or.reduce(self._rows(ids, rows, sources), axis=0) if len(sources) \
+            else np.zeros(self.words, np.uint64)
+        return self._unpack(reached & self.load_mask), self._unpack(~reached & self.load_mask)
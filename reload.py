@@ -0,0 +1,80 @@
+import os
+import threading
+import traceback
+
+# 장비 목록 파일 변경 확인 주기(초) (0이면 감시하지 않음)
+RELOAD_INTERVAL = float(os.environ.get('PF_RELOAD_INTERVAL', '2'))
+
+# 감시 대상: 엑셀 장비 목록과 컴파일된 스냅샷의 메타 파일 (수정 시각, 크기)
+def watched_files(excel_path):
+    # 스냅샷 모듈은 pandas를 불러오므로 감시 스레드에서 처음 필요할 때 불러옴
+    from snapshot import snapshot_path_for, META_FILE
+    return [excel_path, os.path.join(snapshot_path_for(excel_path), META_FILE)]
+
+def file_signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+# 장비 목록 파일을 주기적으로 확인하다가 바뀌면 reload()를 호출하는 감시 스레드
+# loaded(): 불러온 장비 목록의 원본 엑셀 해시 (None이면 아직 읽기 전 -> 처음 읽을 때 최신 파일을 쓰므로 확인하지 않음)
+# 저장 중인 파일을 읽지 않도록 같은 상태가 두 번 연속 확인된 뒤에 다시 읽음
+# 기준 상태는 처음 확인할 때와 다시 읽은 뒤의 파일 상태이지만, 불러오는 동안 파일이 바뀌었으면
+# (불러온 해시와 지금 파일의 해시가 다르면) 기준을 비워 두어 다음 확인에서 다시 읽음
+# 워커 프로세스 여러 개가 같은 변경을 알아채도 스냅샷은 잠금을 잡은 하나만 컴파일하고, 나머지는 메타 파일이 갱신된 뒤 그 결과를 읽음
+class RegisterWatcher(threading.Thread):
+    def __init__(self, excel_path, reload, loaded, interval=RELOAD_INTERVAL):
+        super().__init__(name='pf-register-watcher', daemon=True)
+        self.excel_path = excel_path
+        self.reload = reload
+        self.loaded = loaded
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    # 불러온 장비 목록 기준의 파일 상태 (해시를 모르면 지금 상태를 그대로 기준으로 삼음)
+    def baseline(self, paths):
+        from snapshot import file_hash
+        signature = file_signature(paths)
+        source = self.loaded()
+        try:
+            if source and file_hash(self.excel_path) != source:
+                return ()
+        except OSError:
+            pass
+        return signature
+
+    def run(self):
+        paths = None
+        current = pending = None
+        while not self.stopped.wait(self.interval):
+            if self.loaded() is None:
+                continue
+            if paths is None:
+                paths = watched_files(self.excel_path)
+            if current is None:
+                current = self.baseline(paths)
+            signature = file_signature(paths)
+            if signature == current:
+                pending = None
+                continue
+            if signature != pending:
+                pending = signature
+                continue
+            try:
+                version = self.reload()
+                print(f'장비 목록 다시 읽음: {self.excel_path} (버전 {version})')
+                current = self.baseline(paths)
+            except Exception:
+                # 읽기에 실패하면 이전 토폴로지를 계속 사용하고 다음 변경을 기다림
+                print(f'장비 목록 다시 읽기 실패: {self.excel_path}')
+                traceback.print_exc()
+                current = file_signature(paths)
+            pending = None
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,312 @@
+import argparse
+import hashlib
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from html import escape
+
+import numpy as np
+
+# 그림 기본 크기(픽셀)와 가장자리 여백
+DEFAULT_WIDTH = 1600
+DEFAULT_HEIGHT = 1000
+MARGIN = 20
+# 크기 제한 (너무 큰 요청으로 서버 메모리를 쓰지 않도록)
+MAX_SIZE = 8000
+# 장비 이름을 SVG에 함께 쓰는 최대 장비 수 (넘으면 점만 그림)
+LABEL_LIMIT = 200
+# 장비 상태별 색 (traces.node_colors와 같은 색), 간선/경로 색
+STATUS_COLORS = {'on': (0, 0, 255), 'off': (255, 0, 0)}
+EDGE_COLOR = (136, 136, 136)
+PATH_COLOR = (0, 128, 0)
+PATH_WIDTH = 3
+MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+# numpy 래스터에서 한 번에 찍는 최대 선분 점 수 (임시 배열 메모리 상한, 점 하나에 약 100바이트)
+LINE_CHUNK = 1 << 17
+
+# 장비 수에 맞춘 점 반지름(픽셀)
+def node_radius(node_count):
+    if node_count <= 500:
+        return 6
+    if node_count <= 5000:
+        return 3
+    return 1
+
+# 좌표 배열((N, 2), 범위 -1~1)을 그림의 픽셀 좌표로 변환 (y축은 위가 큰 값)
+def pixel_coordinates(array, width, height):
+    if not len(array):
+        return np.empty((0, 2))
+    low, high = array.min(axis=0), array.max(axis=0)
+    span = np.where(high - low > 0, high - low, 1)
+    scale = np.array([width - 2 * MARGIN - 1, height - 2 * MARGIN - 1]) / span
+    pixels = (array - low) * scale + MARGIN
+    # 한 축에 장비가 한 줄만 있으면 가운데에 놓음
+    pixels[:, high - low <= 0] = np.array([width, height])[high - low <= 0] / 2
+    pixels[:, 1] = height - 1 - pixels[:, 1]
+    return pixels
+
+# 그림에 필요한 배열: 장비 픽셀 좌표, 보이는 간선 (E, 2), 경로 간선 (P, 2), 장비별 상태
+# 간선은 그래프 그림과 같이 off 장비의 출력 간선을 숨김
+def scene(ws, view, path, width, height):
+    import traces
+    topology = ws.topology
+    positions = ws.figure_layout(view)
+    edges = traces.edge_index(topology.edges, positions.index)
+    hidden = np.fromiter((parent in view.off for parent, _ in topology.edges), dtype=bool, count=len(topology.edges))
+    path = [node for node in path if node in positions.index]
+    path_edges = traces.edge_index(list(zip(path, path[1:])), positions.index)
+    status = np.array([view.status(node) for node in positions.nodes])
+    return (positions.nodes, pixel_coordinates(positions.array, width, height),
+            edges[~hidden] if len(edges) else edges, path_edges, status)
+
+# --- PNG: numpy 래스터 (datashader가 없을 때) ---
+
+# 선분마다 긴 축의 픽셀 수만큼 점을 찍는 방식으로 간선 묶음을 한 번에 래스터화
+def _line_steps(pixels, edges):
+    return np.ceil(np.abs(pixels[edges[:, 1]] - pixels[edges[:, 0]]).max(axis=1)).astype(np.intp) + 1
+
+def _line_pixels(pixels, edges):
+    if not len(edges):
+        return np.empty((0, 2), dtype=np.intp)
+    a, b = pixels[edges[:, 0]], pixels[edges[:, 1]]
+    steps = _line_steps(pixels, edges)
+    offsets = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+    t = (offsets / np.repeat(np.maximum(steps - 1, 1), steps))[:, None]
+    points = np.repeat(a, steps, axis=0) + t * np.repeat(b - a, steps, axis=0)
+    return np.rint(points).astype(np.intp)
+
+# 점마다 반지름 radius의 원(또는 두께) 모양 픽셀을 찍음
+def _stamp(image, points, radius, color):
+    if not len(points):
+        return
+    dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    disk = dx * dx + dy * dy <= radius * radius
+    xs = (points[:, 0:1] + dx[disk]).ravel()
+    ys = (points[:, 1:2] + dy[disk]).ravel()
+    height, width = image.shape[:2]
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    image[ys[inside], xs[inside]] = color
+
+# 간선을 점 수가 LINE_CHUNK 안팎인 묶음으로 나눠 그림 (간선이 많아도 임시 배열 크기가 묶음 하나 분량)
+def _draw_lines(image, pixels, edges, radius, color, chunk=LINE_CHUNK):
+    if not len(edges):
+        return
+    ends = np.cumsum(_line_steps(pixels, edges))
+    bounds = np.unique(np.searchsorted(ends, np.arange(chunk, ends[-1], chunk), side='right'))
+    for lo, hi in zip(np.concatenate([[0], bounds]), np.concatenate([bounds, [len(edges)]])):
+        if hi > lo:
+            _stamp(image, _line_pixels(pixels, edges[lo:hi]), radius, color)
+
+def raster_image(pixels, edges, path_edges, status, width, height):
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    _draw_lines(image, pixels, edges, 0, EDGE_COLOR)
+    radius = node_radius(len(pixels))
+    centers = np.rint(pixels).astype(np.intp)
+    for value, color in STATUS_COLORS.items():
+        _stamp(image, centers[status == value], radius, color)
+    # 경로는 장비 위에 그림 (그래프 그림의 경로 트레이스와 같은 순서)
+    _draw_lines(image, pixels, path_edges, PATH_WIDTH // 2, PATH_COLOR)
+    return image
+
+# (H, W, 3) uint8 배열을 PNG 바이트로 변환 (zlib만 사용)
+def encode_png(image):
+    height, width = image.shape[:2]
+    rows = np.concatenate([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)], axis=1)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows.tobytes(), 6))
+            + chunk(b'IEND', b''))
+
+# --- PNG: datashader (설치되어 있으면 사용) ---
+
+def datashader_png(pixels, edges, path_edges, status, width, height):
+    import pandas as pd
+    import datashader as ds
+    import datashader.transfer_functions as tf
+
+    canvas = ds.Canvas(plot_width=width, plot_height=height, x_range=(0, width), y_range=(0, height))
+    # 픽셀 좌표는 y축이 아래로 커지므로 datashader 좌표(위가 큰 값)로 되돌림
+    xs, ys = pixels[:, 0], height - 1 - pixels[:, 1]
+
+    def segments(index):
+        return pd.DataFrame({'x0': xs[index[:, 0]], 'x1': xs[index[:, 1]],
+                             'y0': ys[index[:, 0]], 'y1': ys[index[:, 1]]})
+
+    def hex_color(color):
+        return '#%02x%02x%02x' % color
+
+    images = []
+    if len(edges):
+        lines = canvas.line(segments(edges), x=['x0', 'x1'], y=['y0', 'y1'], axis=1)
+        images.append(tf.shade(lines, cmap=[hex_color(EDGE_COLOR)], how='linear'))
+    nodes = pd.DataFrame({'x': xs, 'y': ys, 'status': pd.Categorical(status, categories=list(STATUS_COLORS))})
+    if len(nodes):
+        points = canvas.points(nodes, 'x', 'y', agg=ds.by('status', ds.count()))
+        shaded = tf.shade(points, color_key={value: hex_color(color) for value, color in STATUS_COLORS.items()},
+                          min_alpha=255)
+        images.append(tf.spread(shaded, px=node_radius(len(nodes)), shape='circle'))
+    if len(path_edges):
+        route = canvas.line(segments(path_edges), x=['x0', 'x1'], y=['y0', 'y1'], axis=1)
+        images.append(tf.spread(tf.shade(route, cmap=[hex_color(PATH_COLOR)], how='linear'), px=PATH_WIDTH // 2))
+    if not images:
+        return encode_png(np.full((height, width, 3), 255, dtype=np.uint8))
+    image = tf.set_background(tf.stack(*images), 'white')
+    # PIL 없이 encode_png로 저장: uint32 RGBA 배열을 (H, W, 4) 바이트로 보고 흰 배경에 합성
+    # datashader 배열은 아래쪽 행이 먼저이므로 위아래를 뒤집음
+    rgba = np.flipud(np.asarray(image.data)).view(np.uint8).reshape(height, width, 4).astype(np.uint16)
+    alpha = rgba[..., 3:]
+    return encode_png(((rgba[..., :3] * alpha + 255 * (255 - alpha)) // 255).astype(np.uint8))
+
+# datashader는 처음 그릴 때 numba JIT 컴파일로 수 초가 걸리므로 요청 전에 작은 그림을 한 번 그려 둠
+def warm_up():
+    try:
+        import datashader  # noqa: F401
+    except ImportError:
+        return
+    pixels = np.array([[1.0, 1.0], [6.0, 6.0]])
+    edges = np.array([[0, 1]])
+    datashader_png(pixels, edges, edges, np.array(['on', 'off']), 8, 8)
+
+def render_png(pixels, edges, path_edges, status, width, height):
+    try:
+        import datashader  # noqa: F401
+    except ImportError:
+        return encode_png(raster_image(pixels, edges, path_edges, status, width, height))
+    return datashader_png(pixels, edges, path_edges, status, width, height)
+
+# --- SVG: 간선/경로는 path 요소 하나씩, 장비는 상태별 그룹의 원 ---
+
+def _svg_path(pixels, edges):
+    if not len(edges):
+        return ''
+    a, b = pixels[edges[:, 0]], pixels[edges[:, 1]]
+    return ''.join(f'M{x0:.1f} {y0:.1f}L{x1:.1f} {y1:.1f}' for (x0, y0), (x1, y1) in zip(a.tolist(), b.tolist()))
+
+def render_svg(nodes, pixels, edges, path_edges, status, width, height):
+    radius = node_radius(len(nodes))
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {width} {height}">',
+             '<rect width="100%" height="100%" fill="white"/>',
+             f'<path d="{_svg_path(pixels, edges)}" stroke="rgb{EDGE_COLOR}" stroke-width="1" fill="none"/>']
+    for value, color in STATUS_COLORS.items():
+        selected = np.flatnonzero(status == value)
+        parts.append(f'<g fill="rgb{color}">')
+        parts.extend(f'<circle cx="{pixels[i, 0]:.1f}" cy="{pixels[i, 1]:.1f}" r="{radius}">'
+                     f'<title>{escape(str(nodes[i]))}</title></circle>' for i in selected)
+        parts.append('</g>')
+    parts.append(f'<path d="{_svg_path(pixels, path_edges)}" stroke="rgb{PATH_COLOR}" '
+                 f'stroke-width="{PATH_WIDTH + 1}" fill="none"/>')
+    if len(nodes) <= LABEL_LIMIT:
+        parts.append('<g font-family="sans-serif" font-size="10" text-anchor="middle">')
+        parts.extend(f'<text x="{x:.1f}" y="{y - radius - 2:.1f}">{escape(str(node))}</text>'
+                     for node, (x, y) in zip(nodes, pixels.tolist()))
+        parts.append('</g>')
+    parts.append('</svg>')
+    return '\n'.join(parts).encode('utf-8')
+
+def render_image(ws, view, path=(), fmt='png', width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+    if fmt not in MIMETYPES:
+        raise ValueError(f'지원하지 않는 형식입니다: {fmt} (png 또는 svg)')
+    nodes, pixels, edges, path_edges, status = scene(ws, view, path, width, height)
+    if fmt == 'svg':
+        return render_svg(nodes, pixels, edges, path_edges, status, width, height)
+    return render_png(pixels, edges, path_edges, status, width, height)
+
+# off 장비 집합의 해시 (캐시 키와 ETag에 사용)
+def status_hash(view):
+    return hashlib.sha1('\n'.join(sorted(map(str, view.off))).encode('utf-8')).hexdigest()[:16]
+
+# 그린 그림의 LRU 캐시: 키는 (토폴로지 버전, 상태 해시, 경로, 형식, 크기)
+# 장비 목록을 다시 읽으면 버전이 바뀌므로 이전 버전의 그림은 모두 버림
+class ImageCache:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def render(self, ws, view, path=(), fmt='png', width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+        key = (ws.version, status_hash(view), tuple(path), fmt, width, height)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return key, self.entries[key], True
+        data = render_image(ws, view, path, fmt, width, height)
+        with self.lock:
+            for stale in [entry for entry in self.entries if entry[0] != ws.version]:
+                del self.entries[stale]
+            self.entries[key] = data
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return key, data, False
+
+image_cache = ImageCache()
+
+def _size(value, default):
+    try:
+        return min(max(int(value), 2 * MARGIN + 1), MAX_SIZE)
+    except (TypeError, ValueError):
+        return default
+
+# Flask 서버에 /render.png, /render.svg 경로를 등록
+#   workspace(): 현재 공유 데이터, overrides(session): 세션의 상태 변경분
+#   요청 인자: session(세션 id), path(쉼표로 구분한 경로 장비), width, height
+def install(server, workspace, overrides):
+    from flask import Response, request
+
+    from profiling import span
+
+    def route(fmt):
+        if fmt not in MIMETYPES:
+            return Response('png 또는 svg만 지원합니다\n', status=404, mimetype='text/plain')
+        # 경로 비용 모델 모듈은 pandas를 불러오므로 첫 요청에서 불러옴
+        from routing import parse_nodes
+        ws = workspace()
+        session_id = request.args.get('session')
+        view = ws.topology.view(overrides(session_id) if session_id else {})
+        path = parse_nodes(request.args.get('path'))
+        width = _size(request.args.get('width'), DEFAULT_WIDTH)
+        height = _size(request.args.get('height'), DEFAULT_HEIGHT)
+        with span('render'):
+            key, data, hit = image_cache.render(ws, view, path, fmt, width, height)
+        etag = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        if request.if_none_match.contains(etag):
+            return Response(status=304)
+        response = Response(data, mimetype=MIMETYPES[fmt])
+        response.set_etag(etag)
+        response.headers['X-Render-Cache'] = 'hit' if hit else 'miss'
+        return response
+
+    server.add_url_rule('/render.<fmt>', 'pf_render', route)
+
+def main():
+    parser = argparse.ArgumentParser(description='장비 계층 그림을 PNG/SVG 파일로 저장')
+    parser.add_argument('excel_path')
+    parser.add_argument('-o', '--output', default='hierarchy.png', help='출력 경로 (.png 또는 .svg)')
+    parser.add_argument('--status', default='', help="장비 상태 변경 (예: 'Sub1,Sub3' 끄기, 'Sub2=on' 켜기)")
+    parser.add_argument('--path', default='', help="강조할 경로 (예: 'Main,Sub1,Load3')")
+    parser.add_argument('--width', type=int, default=DEFAULT_WIDTH)
+    parser.add_argument('--height', type=int, default=DEFAULT_HEIGHT)
+    args = parser.parse_args()
+
+    from workspace import Workspace
+    from scenario import parse_overrides
+    from routing import parse_nodes
+
+    ws = Workspace(args.excel_path)
+    fmt = 'svg' if args.output.lower().endswith('.svg') else 'png'
+    started = time.perf_counter()
+    data = render_image(ws, ws.topology.view(parse_overrides(args.status)), parse_nodes(args.path), fmt,
+                        args.width, args.height)
+    with open(args.output, 'wb') as file:
+        file.write(data)
+    print(f'{args.output} ({len(data):,} bytes, {time.perf_counter() - started:.2f}초)', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+import heapq
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+# 장비 목록의 추가 열로 정하는 장비별 통과 비용 (열이 없으면 무시)
+#   비용: 장비를 지날 때 더하는 값, 손실: 손실률 등 같은 방식으로 더하는 값
+#   점검: 값이 있으면(점검/정비 중) MAINTENANCE_PENALTY를 더함
+COST_COLUMN = '비용'
+LOSS_COLUMN = '손실'
+MAINTENANCE_COLUMN = '점검'
+# 주예비가 'A'(주장비)가 아닌 장비를 지날 때 더하는 비용
+BACKUP_PENALTY = 0.5
+MAINTENANCE_PENALTY = 10.0
+# 한 번의 탐색에서 꺼내 볼 최대 상태 수 (조합 폭발 방지)
+MAX_EXPANSIONS = 1000000
+
+def _truthy(values):
+    text = values.astype(str).str.strip().str.lower()
+    return values.notna() & ~text.isin(['', '0', 'n', 'no', 'false', 'x', '-', 'nan'])
+
+# 장비별 통과 비용 = 1(장비 하나) + 비용 + 손실 + 예비 장비/점검 가산
+# 같은 이름이 여러 행이면 가장 큰 비용을 사용 (주장비 행이 하나라도 있으면 주장비)
+def equipment_costs(df, backup_penalty=BACKUP_PENALTY, maintenance_penalty=MAINTENANCE_PENALTY):
+    if df.empty:
+        return {}
+    cost = pd.Series(1.0, index=df.index)
+    for column in (COST_COLUMN, LOSS_COLUMN):
+        if column in df.columns:
+            cost += pd.to_numeric(df[column], errors='coerce').fillna(0).clip(lower=0)
+    if MAINTENANCE_COLUMN in df.columns:
+        cost += np.where(_truthy(df[MAINTENANCE_COLUMN]), maintenance_penalty, 0.0)
+    cost = cost.groupby(df['장비 이름'], sort=False).max()
+    if '주예비' in df.columns:
+        primary = df['주예비'].eq('A').groupby(df['장비 이름'], sort=False).any()
+        cost += np.where(primary.reindex(cost.index).to_numpy(), 0.0, backup_penalty)
+    return cost.to_dict()
+
+# 정렬 기준별 장비 통과 비용 (포함/제외 조건이 있는 탐색에서 정렬 버튼을 따르도록)
+#   'shortest': 장비마다 1 -> 경로 길이 순
+#   'priority': 장비마다 1 + 주장비 수가 적을수록 작은 가산 (가산의 합 < 1)
+#               -> 길이 순, 길이가 같으면 주장비 점수(score_path)가 큰 순
+def sort_costs(topology, sort):
+    nodes = topology.base.nodes
+    if sort != 'priority':
+        return dict.fromkeys(nodes, 1.0)
+    primary = topology.primary
+    most = max(primary.values(), default=0)
+    unit = 1.0 / (len(nodes) * most + 1)
+    return {node: 1.0 + unit * (most - primary.get(node, 0)) for node in nodes}
+
+# 장비별 비용과 레벨 기반 A* 추정치를 미리 준비해 두는 경로 비용 모델 (토폴로지마다 하나)
+class RouteModel:
+    def __init__(self, topology, costs=None):
+        self.version = topology.version
+        base = topology.base
+        self.costs = costs if costs is not None else equipment_costs(topology.df)
+        self.levels = dict(base.nodes(data='level'))
+        self.min_cost = min(self.costs.values(), default=1.0)
+        # 간선마다 레벨이 늘어나면 남은 레벨 차로 남은 장비 수의 하한을 계산할 수 있음
+        steps = [self.levels[child] - self.levels[parent] for parent, child in base.edges()]
+        self.monotonic = all(step > 0 for step in steps)
+        self.max_step = max(steps, default=1)
+
+    def cost(self, node):
+        return self.costs.get(node, 1.0)
+
+    def path_cost(self, path):
+        return sum(self.cost(node) for node in path)
+
+    # 목적지까지 남은 비용의 하한: 남은 레벨 차를 한 간선의 최대 레벨 증가로 나눈 장비 수 x 최소 비용
+    # (레벨이 줄어드는 간선이 있으면 하한을 0으로 두어 다익스트라와 같게 동작)
+    def heuristic(self, end):
+        if not self.monotonic:
+            return lambda node: 0.0
+        target, levels, step, unit = self.levels[end], self.levels, self.max_step, self.min_cost
+
+        def estimate(node):
+            remaining = target - levels[node]
+            if remaining < 0:
+                return math.inf
+            return math.ceil(remaining / step) * unit
+        return estimate
+
+    # 비용이 작은 순으로 경로를 하나씩 생성 (K개 최선 경로)
+    #   must_include: 모두 지나야 하는 장비 (순서 무관), must_avoid: 지나면 안 되는 장비
+    # 상태 (장비, 지난 필수 장비 집합)마다 최대 k번까지만 꺼내는 A* (DAG에서는 K개 최단 경로와 같음)
+    # 경로는 (장비, 이전 연결) 형태의 연결 목록으로 앞부분을 공유하므로 분기마다 경로를 복사하지 않음
+    def iter_routes(self, G, start, end, k, must_include=(), must_avoid=(), max_expansions=MAX_EXPANSIONS):
+        avoid = set(must_avoid)
+        if start in avoid or end in avoid or start not in G or end not in G:
+            return
+        waypoints = {node: 1 << i for i, node in enumerate(dict.fromkeys(must_include))}
+        goal = (1 << len(waypoints)) - 1
+        estimate = self.heuristic(end)
+        cost = self.cost
+        check_cycles = not self.monotonic
+
+        order = itertools.count()
+        g = cost(start)
+        heap = [(g + estimate(start), next(order), g, start, waypoints.get(start, 0), None)]
+        pops = {}
+        found = 0
+        for _ in range(max_expansions):
+            if not heap or found >= k:
+                return
+            _, _, g, node, mask, link = heapq.heappop(heap)
+            state = (node, mask)
+            if pops.get(state, 0) >= k:
+                continue
+            pops[state] = pops.get(state, 0) + 1
+            link = (node, link)
+            if node == end:
+                if mask == goal:
+                    found += 1
+                    yield g, _unwind(link)
+                continue
+            for child in G.successors(node):
+                if child in avoid or (check_cycles and _contains(link, child)):
+                    continue
+                f = estimate(child)
+                if f == math.inf:
+                    continue
+                child_g = g + cost(child)
+                heapq.heappush(heap, (child_g + f, next(order), child_g, child, mask | waypoints.get(child, 0), link))
+
+    def best_routes(self, G, start, end, k, must_include=(), must_avoid=()):
+        return list(self.iter_routes(G, start, end, k, must_include, must_avoid))
+
+# 시작 장비에서 끝 장비까지 제외 장비를 지나지 않는 최단 경로의 장비 수 (없으면 None)
+# G는 successors와 in만 사용 (그래프 뷰와 batch.Adjacency 모두 가능)
+def shortest_length(G, start, end, avoid=()):
+    if start in avoid or end in avoid or start not in G or end not in G:
+        return None
+    seen = {start}
+    frontier = [start]
+    length = 1
+    while frontier:
+        if end in seen:
+            return length
+        length += 1
+        found = []
+        for node in frontier:
+            for child in G.successors(node):
+                if child not in seen and child not in avoid:
+                    seen.add(child)
+                    found.append(child)
+        frontier = found
+    return length if end in seen else None
+
+# 포함/제외 조건이 있는 최단/주장비 우선 탐색 (화면과 배치가 함께 사용)
+# model은 sort_costs 비용의 RouteModel -> 장비 수(+주장비 가산) 순으로 나오는 경로를
+# 조건 없는 탐색처럼 최단 길이까지만 냄 (제외 장비는 그래프에서 뺀 것으로 보고, 포함 장비는 걸러내기)
+def iter_shortest_routes(model, G, start, end, k, must_include=(), must_avoid=()):
+    avoid = set(must_avoid)
+    length = shortest_length(G, start, end, avoid)
+    if length is None:
+        return
+    for cost, path in model.iter_routes(G, start, end, k, must_include, avoid):
+        if len(path) > length:
+            return
+        yield cost, path
+
+def _unwind(link):
+    path = []
+    while link is not None:
+        path.append(link[0])
+        link = link[1]
+    return path[::-1]
+
+def _contains(link, node):
+    while link is not None:
+        if link[0] == node:
+            return True
+        link = link[1]
+    return False
+
+# 필터 입력값('A, B')을 장비 이름 목록으로
+def parse_nodes(text):
+    if not text:
+        return ()
+    return tuple(node.strip() for node in str(text).split(',') if node.strip())
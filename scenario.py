@@ -0,0 +1,145 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import networkx as nx
+import pandas as pd
+
+from snapshot import load_equipment
+from topology import Topology
+from reach import ReachabilityIndex
+from routing import RouteModel, parse_nodes
+from paths import TOP_K
+
+# 비교 결과에서 기준 상태를 나타내는 시나리오 이름
+BASELINE = '기준'
+# 보고서의 부하 목록 칸에 표시할 최대 장비 수
+LIST_LIMIT = 10
+
+_worker = {}
+
+# 시나리오 평가에 필요한 공유 입력 (작업 프로세스마다 한 번만 전달)
+#   index: 도달 가능성 색인, base: 구조 그래프, model: 경로 비용 모델
+#   pairs: 확인할 (시작, 끝) 장비 쌍, routes: 쌍마다 기준 상태의 상위 경로
+def _init_worker(base, off, version, model, pairs, routes):
+    _worker.update(index=ReachabilityIndex(base, off, version), base=base, model=model, pairs=pairs, routes=routes)
+
+def _evaluate(task):
+    return evaluate_scenario(*task, **_worker)
+
+# 시나리오 하나(off 장비 집합)의 통전 부하와 장비 쌍별 연결/경로 유지 여부
+# 색인은 시나리오의 off 장비에 맞춰 바뀐 장비의 상위 장비만 다시 계산
+def evaluate_scenario(name, off, index, base, model, pairs, routes):
+    energized, outage = index.energized_loads(off)
+    active = nx.subgraph_view(base, filter_node=lambda node: node not in off)
+    rows = []
+    for (start, end), baseline_routes in zip(pairs, routes):
+        reachable = start in index and end in index and index.has_path(start, end, off)
+        best = next(model.iter_routes(active, start, end, 1), None) if reachable else None
+        rows.append({
+            '시작': start,
+            '끝': end,
+            '연결 가능': reachable,
+            '유지 경로 수': sum(1 for path in baseline_routes if off.isdisjoint(path)),
+            '최선 경로 비용': best[0] if best else None,
+            '최선 경로': ' -> '.join(best[1]) if best else '',
+        })
+    return name, frozenset(outage), rows
+
+# 여러 시나리오를 기준 상태와 비교
+#   scenarios: {이름: 상태 변경분}, baseline: 기준 상태의 변경분 (둘 다 장비 목록의 상태 기준, 없으면 장비 목록의 상태)
+#   pairs: [(시작, 끝)] 장비 쌍 / 시나리오는 모두 같은 토폴로지 위의 off 장비 집합으로만 평가
+# 시나리오가 여러 개면 프로세스 풀로 병렬 평가 (workers=1이면 index로 현재 프로세스에서 평가)
+# 반환: (시나리오별 요약, 시나리오 x 장비 쌍별 결과) DataFrame
+def compare_scenarios(topology, scenarios, pairs=(), baseline=None, k=TOP_K, model=None, index=None,
+                      workers=None, progress=None):
+    model = model or RouteModel(topology)
+    pairs = [(start, end) for start, end in pairs]
+    base_view = topology.view(baseline or {})
+    routes = [[path for _, path in model.iter_routes(base_view.active, start, end, k)] for start, end in pairs]
+    tasks = [(BASELINE, frozenset(base_view.off))]
+    tasks += [(name, frozenset(topology.view(overrides).off))
+              for name, overrides in scenarios.items()]
+
+    results = []
+    if workers == 1 or len(tasks) <= 2:
+        if index is None:
+            index = ReachabilityIndex(topology.base, base_view.off, topology.version)
+        context = dict(index=index, base=topology.base, model=model, pairs=pairs, routes=routes)
+        for done, task in enumerate(tasks, start=1):
+            results.append(evaluate_scenario(*task, **context))
+            if progress is not None:
+                progress(done, len(tasks))
+    else:
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(topology.base, base_view.off, topology.version, model, pairs, routes)) as pool:
+            for done, result in enumerate(pool.map(_evaluate, tasks), start=1):
+                results.append(result)
+                if progress is not None:
+                    progress(done, len(tasks))
+    return scenario_diff(results, base_view.off, tasks, routes)
+
+# 기준 상태 대비 정전/복구 부하와 장비 쌍별 연결 변화
+def scenario_diff(results, baseline_off, tasks, routes):
+    _, baseline_outage, baseline_rows = results[0]
+    summary, pair_rows = [], []
+    for (name, outage, rows), (_, off) in zip(results, tasks):
+        lost = sorted(outage - baseline_outage)
+        restored = sorted(baseline_outage - outage)
+        summary.append({
+            '시나리오': name,
+            '변경 장비 수': len(off ^ baseline_off),
+            '정전 부하 수': len(outage),
+            '추가 정전 부하 수': len(lost),
+            '복구 부하 수': len(restored),
+            '연결 가능 쌍': sum(row['연결 가능'] for row in rows),
+            '추가 정전 부하': ', '.join(lost[:LIST_LIMIT]),
+            '복구 부하': ', '.join(restored[:LIST_LIMIT]),
+        })
+        for row, base_row, baseline_routes in zip(rows, baseline_rows, routes):
+            if row['연결 가능'] == base_row['연결 가능']:
+                change = '유지' if row['유지 경로 수'] == len(baseline_routes) else '우회'
+            else:
+                change = '복구' if row['연결 가능'] else '끊김'
+            pair_rows.append({'시나리오': name, **row, '기준 경로 수': len(baseline_routes),
+                              '기준 최선 경로 비용': base_row['최선 경로 비용'], '변화': change})
+    pair_columns = ['시나리오', '시작', '끝', '연결 가능', '변화', '유지 경로 수', '기준 경로 수',
+                    '최선 경로 비용', '기준 최선 경로 비용', '최선 경로']
+    return pd.DataFrame(summary), pd.DataFrame(pair_rows, columns=pair_columns)
+
+# 'Sub1,Sub3' -> {Sub1: off, Sub3: off} ('장비=on'이면 켬)
+def parse_overrides(text):
+    overrides = {}
+    for item in parse_nodes(text):
+        node, _, status = item.partition('=')
+        overrides[node.strip()] = status.strip() or 'off'
+    return overrides
+
+def main():
+    parser = argparse.ArgumentParser(description='장비 상태 변경 시나리오를 기준 상태와 비교')
+    parser.add_argument('excel_path')
+    parser.add_argument('-s', '--scenario', action='append', default=[], metavar='이름=장비,장비',
+                        help="시나리오 (예: 'plan-a=Sub1,Sub3', 켜려면 'Sub2=on')")
+    parser.add_argument('-p', '--pair', action='append', default=[], metavar='시작:끝', help='연결을 확인할 장비 쌍')
+    parser.add_argument('-k', type=int, default=TOP_K, help='쌍마다 비교할 기준 상태의 상위 경로 수')
+    parser.add_argument('-o', '--output', default='scenarios.csv', help='장비 쌍별 결과 CSV 경로')
+    parser.add_argument('--workers', type=int, help='프로세스 수 (기본값: CPU 수)')
+    args = parser.parse_args()
+
+    df, edges = load_equipment(args.excel_path, edges=True)
+    topology = Topology(df, edges=edges)
+    scenarios = {}
+    for spec in args.scenario:
+        name, _, nodes = spec.partition('=')
+        scenarios[name.strip()] = parse_overrides(nodes)
+    pairs = [tuple(node.strip() for node in pair.split(':', 1)) for pair in args.pair]
+    summary, pair_report = compare_scenarios(topology, scenarios, pairs, k=args.k, workers=args.workers)
+    print(summary.to_string(index=False))
+    if pairs:
+        pair_report.to_csv(args.output, index=False, encoding='utf-8-sig')
+        print(pair_report.drop(columns='최선 경로').to_string(index=False))
+        print(f'{len(pair_report)}행 -> {args.output}')
+
+if __name__ == '__main__':
+    main()
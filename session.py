@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import threading
+import time
+
+# 세션별 장비 상태 변경분을 저장하는 SQLite 파일 (여러 워커 프로세스가 공유)
+DB_PATH = os.environ.get('PF_SESSION_DB', 'pf_sessions.db')
+# 이 시간(초) 동안 사용되지 않은 세션의 상태는 정리
+SESSION_TTL = 24 * 60 * 60
+
+# 공유 토폴로지 위에 세션별 상태 변경분(기본 상태와 다른 장비만)을 얹는 저장소
+class StatusStore:
+    def __init__(self, path=DB_PATH, ttl=SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS overlay ('
+                ' session TEXT NOT NULL, node TEXT NOT NULL, status TEXT NOT NULL,'
+                ' updated REAL NOT NULL, PRIMARY KEY (session, node))')
+            # 세션별 이름 있는 시나리오 목록 (변경분은 overlay 표에 '세션#이름' 키로 저장)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS scenario ('
+                ' session TEXT NOT NULL, name TEXT NOT NULL, updated REAL NOT NULL,'
+                ' PRIMARY KEY (session, name))')
+            expired = time.time() - ttl
+            conn.execute('DELETE FROM overlay WHERE updated < ?', (expired,))
+            conn.execute('DELETE FROM scenario WHERE updated < ?', (expired,))
+
+    # sqlite 연결은 스레드 사이에 공유할 수 없으므로 스레드마다 하나씩 사용
+    # (백그라운드 작업 프로세스로 fork된 경우에도 부모의 연결을 쓰지 않고 새로 연결)
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def overrides(self, session):
+        if not session:
+            return {}
+        rows = self._connect().execute('SELECT node, status FROM overlay WHERE session = ?', (session,))
+        return dict(rows.fetchall())
+
+    def set_status(self, session, node, status, base_status):
+        conn = self._connect()
+        if status == base_status:
+            conn.execute('DELETE FROM overlay WHERE session = ? AND node = ?', (session, node))
+        else:
+            conn.execute('INSERT OR REPLACE INTO overlay VALUES (?, ?, ?, ?)',
+                         (session, node, status, time.time()))
+
+    def clear(self, session):
+        self._connect().execute('DELETE FROM overlay WHERE session = ?', (session,))
+
+    # 시나리오 변경분을 담는 overlay 키
+    @staticmethod
+    def scenario_key(session, name):
+        return f'{session}#{name}'
+
+    def scenarios(self, session):
+        rows = self._connect().execute('SELECT name FROM scenario WHERE session = ? ORDER BY name', (session,))
+        return [name for name, in rows.fetchall()]
+
+    # 변경분(기본 상태와 다른 장비)만 복사하므로 토폴로지나 장비 목록은 복사하지 않음
+    def _copy(self, conn, source, target):
+        conn.execute('DELETE FROM overlay WHERE session = ?', (target,))
+        conn.execute('INSERT INTO overlay SELECT ?, node, status, ? FROM overlay WHERE session = ?',
+                     (target, time.time(), source))
+
+    # 세션의 현재 상태(또는 다른 시나리오)를 이름 있는 시나리오로 분기 (같은 이름이면 덮어씀)
+    def fork(self, session, name, source=None):
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN')
+            self._copy(conn, self.scenario_key(session, source) if source else session,
+                       self.scenario_key(session, name))
+            conn.execute('INSERT OR REPLACE INTO scenario VALUES (?, ?, ?)', (session, name, time.time()))
+
+    # 시나리오의 상태를 세션의 현재 상태로 적용 (시나리오는 그대로 남음)
+    def apply(self, session, name):
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN')
+            self._copy(conn, self.scenario_key(session, name), session)
+
+    def discard(self, session, name):
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN')
+            conn.execute('DELETE FROM overlay WHERE session = ?', (self.scenario_key(session, name),))
+            conn.execute('DELETE FROM scenario WHERE session = ? AND name = ?', (session, name))
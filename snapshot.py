@@ -0,0 +1,203 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import read_register
+
+SNAPSHOT_SUFFIX = '.snapshot'
+META_FILE = 'meta.json'
+# 컴파일 잠금 파일이 이보다 오래되면(초) 컴파일하던 프로세스가 죽은 것으로 보고 지움
+COMPILE_LOCK_STALE = 600
+# 다른 프로세스의 컴파일이 끝났는지 확인하는 간격(초)
+COMPILE_LOCK_POLL = 0.2
+
+def snapshot_path_for(excel_path):
+    return excel_path + SNAPSHOT_SUFFIX
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _source_meta(excel_path):
+    stat = os.stat(excel_path)
+    return {'source': os.path.abspath(excel_path), 'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size, 'sha256': file_hash(excel_path)}
+
+def read_meta(snapshot_path):
+    try:
+        with open(os.path.join(snapshot_path, META_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# 메타 파일을 임시 파일에 쓴 뒤 한 번에 교체 (읽는 쪽이 쓰다 만 파일을 보지 않도록)
+def write_meta(snapshot_path, meta):
+    path = os.path.join(snapshot_path, META_FILE)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+# 스냅샷을 쓰는 동안 잡는 잠금 파일 (여러 워커 프로세스 중 하나만 컴파일하고 나머지는 끝날 때까지 기다림)
+# O_EXCL로 파일을 만든 프로세스가 잠금을 가짐 (운영체제별 잠금 API 없이 동작)
+@contextlib.contextmanager
+def compile_lock(snapshot_path):
+    lock_path = snapshot_path + '.lock'
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(lock_path).st_mtime > COMPILE_LOCK_STALE:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            time.sleep(COMPILE_LOCK_POLL)
+    try:
+        os.write(fd, str(os.getpid()).encode('ascii'))
+        os.close(fd)
+        yield
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(lock_path)
+
+# 장비 목록을 열 단위 NumPy 파일 묶음으로 저장: 임시 디렉터리에 모두 쓴 뒤 한 번에 교체
+#   names: 장비 이름 사전 (데이터에 없는 부모 장비 이름 포함)
+#   name_id: 행별 장비 이름 번호, parent_indptr/parent_indices: 행별 부모 장비 번호 (CSR)
+#   columns: (열 이름, Series) 순회 (생성기를 넘기면 열 하나씩 만들어 쓰고 버리므로 최대 메모리가 열 하나 분량)
+#   장비 이름/부모 장비 열은 이름 사전과 부모 CSR로 저장하므로 열 순서만 기록, 그 외 열은 값 배열과 결측 마스크로 저장
+def write_bundle(snapshot_path, names, name_id, parent_indptr, parent_indices, columns, rows, meta=None):
+    tmp_path = f'{snapshot_path}.tmp-{os.getpid()}'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, 'names.npy'), np.asarray(names, dtype=str))
+    np.save(os.path.join(tmp_path, 'name_id.npy'), np.asarray(name_id, dtype=np.int32))
+    np.save(os.path.join(tmp_path, 'parent_indptr.npy'), np.asarray(parent_indptr, dtype=np.int32))
+    np.save(os.path.join(tmp_path, 'parent_indices.npy'), np.asarray(parent_indices, dtype=np.int32))
+
+    column_meta = []
+    for i, (column, series) in enumerate(columns):
+        if column in ('장비 이름', '부모 장비'):
+            column_meta.append({'name': column})
+            continue
+        values = series.to_numpy() if pd.api.types.is_numeric_dtype(series) else np.asarray(series.astype(str), dtype=str)
+        np.save(os.path.join(tmp_path, f'col{i}.npy'), values)
+        np.save(os.path.join(tmp_path, f'na{i}.npy'), series.isna().to_numpy())
+        column_meta.append({'name': column, 'file': i})
+
+    meta = dict(meta or {}, rows=rows, columns=column_meta)
+    with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    shutil.rmtree(snapshot_path, ignore_errors=True)
+    os.replace(tmp_path, snapshot_path)
+
+# 스냅샷의 배열들을 메모리 매핑으로 열어 이름별로 반환 (그 외 열은 열 이름으로)
+def snapshot_arrays(snapshot_path):
+    meta = read_meta(snapshot_path)
+    if meta is None:
+        raise FileNotFoundError(f'스냅샷이 없습니다: {snapshot_path}')
+
+    def load(name):
+        return np.load(os.path.join(snapshot_path, name), mmap_mode='r')
+
+    arrays = {'meta': meta}
+    for name in ('names', 'name_id', 'parent_indptr', 'parent_indices'):
+        arrays[name] = load(f'{name}.npy')
+    for column in meta['columns']:
+        if 'file' in column:
+            arrays[column['name']] = load(f"col{column['file']}.npy")
+            arrays[column['name'] + ':na'] = load(f"na{column['file']}.npy")
+    return arrays
+
+# 부모 CSR에서 바로 만든 (부모, 자식) 이름 간선 (utils.explode_parents와 같은 순서, 문자열을 다시 나누지 않음)
+def snapshot_edges(arrays):
+    names = arrays['names']
+    child = np.repeat(arrays['name_id'], np.diff(arrays['parent_indptr']))
+    return pd.DataFrame({'parent': names[arrays['parent_indices']], 'child': names[child]})
+
+# 스냅샷을 read_excel과 같은 형태의 데이터프레임으로 복원
+# edges=True면 (데이터프레임, 부모 CSR에서 만든 간선)을 반환 (Topology가 그래프 생성에 사용)
+def load_snapshot(snapshot_path, edges=False):
+    arrays = snapshot_arrays(snapshot_path)
+    meta = arrays['meta']
+    indptr = arrays['parent_indptr']
+    parent_names = arrays['names'][arrays['parent_indices']].tolist()
+    parents = [', '.join(parent_names[indptr[i]:indptr[i + 1]]) if indptr[i + 1] > indptr[i] else np.nan
+               for i in range(meta['rows'])]
+
+    data = {}
+    for column in meta['columns']:
+        name = column['name']
+        if name == '장비 이름':
+            data[name] = arrays['names'][arrays['name_id']]
+        elif name == '부모 장비':
+            data[name] = parents
+        else:
+            data[name] = pd.Series(np.asarray(arrays[name])).mask(np.asarray(arrays[name + ':na']))
+    df = pd.DataFrame(data)
+    # 원본 엑셀의 내용 해시 (Workspace가 토폴로지 버전으로 사용)
+    if meta.get('sha256'):
+        df.attrs['sha256'] = meta['sha256']
+    return (df, snapshot_edges(arrays)) if edges else df
+
+# 엑셀 장비 목록을 청크 단위로 읽은 배열을 전체 데이터프레임 없이 바로 스냅샷으로 쓴 뒤 스냅샷에서 읽음
+# 읽기 오류는 그대로 전달 (빈 장비 목록으로 앱이 뜨지 않도록)
+def compile_snapshot(excel_path, snapshot_path=None, edges=False):
+    snapshot_path = snapshot_path or snapshot_path_for(excel_path)
+    builder = read_register(excel_path)
+    rows = sum(len(ids) for ids in builder.row_name)
+    if not rows:
+        return (builder.frame(), None) if edges else builder.frame()
+    name_table, row_name, _, _, parent_indptr, parent_indices = builder.arrays()
+    write_bundle(snapshot_path, name_table, row_name, parent_indptr, parent_indices,
+                 builder.iter_columns(), rows, _source_meta(excel_path))
+    return load_snapshot(snapshot_path, edges)
+
+def _same_file(meta, excel_path):
+    stat = os.stat(excel_path)
+    return meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size
+
+# 엑셀 파일의 수정 시각(또는 내용 해시)이 스냅샷과 같으면 스냅샷을 읽고, 다르면 다시 컴파일
+# 스냅샷을 고쳐 써야 하면 잠금을 잡고 다시 확인 -> 다른 워커가 먼저 컴파일했으면 그 결과를 읽음
+# edges=True면 (데이터프레임, 간선 또는 None)을 반환 (load_snapshot 참고)
+def load_equipment(excel_path, snapshot_path=None, edges=False):
+    snapshot_path = snapshot_path or snapshot_path_for(excel_path)
+    meta = read_meta(snapshot_path)
+    if meta is not None and (not os.path.exists(excel_path) or _same_file(meta, excel_path)):
+        return load_snapshot(snapshot_path, edges)
+    with compile_lock(snapshot_path):
+        meta = read_meta(snapshot_path)
+        if meta is None or not _same_file(meta, excel_path):
+            if meta is None or meta.get('sha256') != file_hash(excel_path):
+                return compile_snapshot(excel_path, snapshot_path, edges)
+            # 내용은 같고 수정 시각만 바뀐 경우: 메타 정보만 갱신
+            stat = os.stat(excel_path)
+            meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            write_meta(snapshot_path, meta)
+    return load_snapshot(snapshot_path, edges)
+
+def main():
+    parser = argparse.ArgumentParser(description='엑셀 장비 목록을 스냅샷으로 컴파일')
+    parser.add_argument('excel_path')
+    parser.add_argument('-o', '--output', help='스냅샷 경로 (기본값: <엑셀 경로>.snapshot)')
+    args = parser.parse_args()
+    snapshot_path = args.output or snapshot_path_for(args.excel_path)
+    with compile_lock(snapshot_path):
+        df = compile_snapshot(args.excel_path, snapshot_path)
+    print(f"{len(df)}행 -> {snapshot_path}")
+
+if __name__ == '__main__':
+    main()
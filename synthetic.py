@@ -0,0 +1,75 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+# 벤치마크/부하 시험용 가상 설비 계층 생성
+#   levels: 계층 수, fan_out: 한 장비당 평균 자식 수 (레벨별 장비 수가 이 비율로 늘어남)
+#   redundancy: 예비 부모(같은 레벨의 다른 장비)를 하나 더 갖는 장비 비율
+#   primary_ratio: 주예비가 'A'(주장비)인 비율, off_ratio: 초기 상태가 off인 비율
+def generate_plant(rows, levels=10, fan_out=3.0, redundancy=0.3, primary_ratio=0.5, off_ratio=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    levels = max(1, min(levels, rows))
+
+    # 레벨별 장비 수: fan_out 비율의 등비수열을 rows에 맞게 조정 (레벨마다 최소 1개)
+    weights = float(fan_out) ** np.arange(levels)
+    sizes = np.maximum(1, np.floor(weights / weights.sum() * rows).astype(np.int64))
+    sizes[-1] += rows - sizes.sum()
+    while sizes[-1] < 1:
+        largest = np.argmax(sizes[:-1])
+        sizes[largest] -= 1
+        sizes[-1] += 1
+    level = np.repeat(np.arange(1, levels + 1), sizes)
+    names = np.array([f'L{lv}-{i}' for i, lv in enumerate(level.tolist())], dtype=object)
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+
+    parents = np.full(rows, None, dtype=object)
+    for depth in range(1, levels):
+        lo, hi = starts[depth - 1], starts[depth]
+        count = starts[depth + 1] - hi
+        # 자식을 부모 순서대로 고르게 나눠 배정 (실제 계통처럼 같은 부모의 자식이 이웃하도록)
+        primary = lo + np.arange(count) * (hi - lo) // count
+        text = names[primary].copy()
+        # 예비 부모: 같은 레벨에서 주 부모와 다른 장비 하나
+        backup = rng.random(count) < redundancy if hi - lo > 1 else np.zeros(count, dtype=bool)
+        if backup.any():
+            shift = rng.integers(1, hi - lo, size=int(backup.sum()))
+            other = lo + (primary[backup] - lo + shift) % (hi - lo)
+            text[backup] = [f'{a}, {b}' for a, b in zip(text[backup].tolist(), names[other].tolist())]
+        parents[hi:hi + count] = text
+
+    return pd.DataFrame({
+        '레벨': level,
+        '장비 이름': names,
+        '부모 장비': parents,
+        '주예비': np.where(rng.random(rows) < primary_ratio, 'A', 'S'),
+        '상태': np.where(rng.random(rows) < off_ratio, 'off', 'on'),
+    })
+
+# 생성한 설비 데이터를 엑셀 장비 목록 형식으로 저장 (쓰기 전용 모드, '상태' 열 제외)
+def write_workbook(df, path):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    columns = [column for column in df.columns if column != '상태']
+    sheet.append(columns)
+    for values in df[columns].itertuples(index=False):
+        sheet.append([None if value is None or value != value else value for value in values])
+    workbook.save(path)
+
+def main():
+    parser = argparse.ArgumentParser(description='가상 설비 장비 목록 생성')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('-o', '--output', default='synthetic.xlsx')
+    parser.add_argument('--levels', type=int, default=10)
+    parser.add_argument('--fan-out', type=float, default=3.0)
+    parser.add_argument('--redundancy', type=float, default=0.3)
+    parser.add_argument('--primary-ratio', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    df = generate_plant(args.rows, args.levels, args.fan_out, args.redundancy, args.primary_ratio, seed=args.seed)
+    write_workbook(df, args.output)
+    print(f'{len(df)}행 -> {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import numpy as np
+
+# 제어 테이블 열 이름
+LEVEL, NAME, STATUS, TOGGLE = '레벨', '장비명', '장비상태', '토글'
+PAGE_SIZE = 50
+
+_OPERATORS = [['ge ', '>='], ['le ', '<='], ['lt ', '<'], ['gt ', '>'], ['ne ', '!='], ['eq ', '='],
+              ['contains '], ['datestartswith ']]
+
+# DataTable filter_query 한 조각('{열} 연산자 값')을 (열, 연산자, 값)으로 분리
+def _split_filter_part(filter_part):
+    for operator_type in _OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+                value_part = value_part.strip()
+                if value_part and value_part[0] == value_part[-1] and value_part[0] in ("'", '"', '`'):
+                    value = value_part[1:-1].replace('\\' + value_part[0], value_part[0])
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+def parse_filter(filter_query):
+    if not filter_query:
+        return []
+    parts = [_split_filter_part(part) for part in filter_query.split(' && ')]
+    return [part for part in parts if part[0]]
+
+# 레벨 순으로 정렬된 장비 목록(topology.table_names/table_levels)에 대한 페이지 단위 조회
+# 레벨 조건은 정렬된 레벨 배열에서 이진 탐색으로 구간을 자르고, 나머지 조건만 그 구간에 마스크로 적용
+def query_equipment(topology, off, page_current=0, page_size=PAGE_SIZE, filter_query='', sort_by=None):
+    names = topology.table_names
+    levels = topology.table_levels
+    filters = parse_filter(filter_query)
+
+    lo, hi = 0, len(names)
+    for column, operator, value in filters:
+        if column != LEVEL or not isinstance(value, float):
+            continue
+        if operator in ('eq', 'ge'):
+            lo = max(lo, np.searchsorted(levels, value, 'left'))
+        if operator in ('eq', 'le'):
+            hi = min(hi, np.searchsorted(levels, value, 'right'))
+        if operator == 'gt':
+            lo = max(lo, np.searchsorted(levels, value, 'right'))
+        if operator == 'lt':
+            hi = min(hi, np.searchsorted(levels, value, 'left'))
+    rows = np.arange(lo, max(lo, hi))
+
+    off = np.array(sorted(off), dtype=str)
+    keep = np.ones(len(rows), dtype=bool)
+    for column, operator, value in filters:
+        if column == LEVEL and operator == 'ne':
+            keep &= levels[rows] != value
+        elif column == NAME:
+            if operator == 'contains':
+                keep &= np.char.find(names[rows], str(value)) >= 0
+            elif operator == 'ne':
+                keep &= names[rows] != str(value)
+            else:
+                keep &= names[rows] == str(value)
+        elif column == STATUS:
+            is_off = np.isin(names[rows], off)
+            keep &= is_off if (str(value) == 'off') == (operator != 'ne') else ~is_off
+    rows = rows[keep]
+
+    # 기본 순서(레벨 순)가 아닌 정렬만 별도로 처리
+    if sort_by:
+        column, descending = sort_by[0]['column_id'], sort_by[0]['direction'] == 'desc'
+        if column == NAME:
+            keys = names[rows]
+        elif column == STATUS:
+            keys = ~np.isin(names[rows], off)
+        else:
+            keys = levels[rows]
+        order = np.argsort(keys, kind='stable')
+        rows = rows[order[::-1]] if descending else rows[order]
+
+    page = rows[page_current * page_size:(page_current + 1) * page_size]
+    off = set(off.tolist())
+    data = [{'id': name, LEVEL: level, NAME: name, STATUS: 'off' if name in off else 'on', TOGGLE: 'Toggle Status'}
+            for name, level in zip(names[page].tolist(), levels[page].tolist())]
+    page_count = max(1, -(-len(rows) // page_size))
+    return data, page_count
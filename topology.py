@@ -0,0 +1,100 @@
+import hashlib
+import json
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from utils import create_graph_with_status
+
+# 장비 목록 내용으로 정한 버전: 같은 내용이면 프로세스(워커)가 달라도 같은 값
+def content_version(df):
+    digest = hashlib.sha256(json.dumps(list(map(str, df.columns)), ensure_ascii=False).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+# 계층 구조를 한 번만 읽어 두는 읽기 전용 토폴로지 (장비 상태 변경은 세션별 TopologyView로 얹음)
+class Topology:
+    # edges: 스냅샷의 부모 CSR에서 만든 (부모, 자식) 간선 (없으면 '부모 장비' 열을 펼쳐 만듦)
+    def __init__(self, df, version=None, edges=None):
+        self.df = df
+        # 장비 목록 내용의 해시 (캐시 키와 그림 버전으로 사용, 스냅샷의 원본 해시를 넘겨받으면 그대로 씀)
+        self.version = version or content_version(df)
+
+        # 주예비 == 'A'인 행 수를 장비별로 미리 집계한 경로 점수 가중치
+        if '주예비' in df.columns:
+            self.primary = df['주예비'].eq('A').groupby(df['장비 이름'], sort=False).sum().to_dict()
+        else:
+            self.primary = {}
+
+        # 상태와 관계없는 전체 연결 구조 (off 장비의 출력 간선 복원용)
+        self.base = create_graph_with_status(df.assign(상태='on'), edges) if not df.empty else nx.DiGraph()
+        # 전체 간선 목록과 장비별 출력 간선 위치 (그림의 간선 구간 패치용)
+        self.edges = list(self.base.edges())
+        self.out_slots = {}
+        for slot, (parent, child) in enumerate(self.edges):
+            self.out_slots.setdefault(parent, []).append(slot)
+        # 레벨 순으로 정렬한 장비 목록과 장비별 행 번호 (제어 테이블용)
+        self.by_level = sorted(self.base.nodes, key=lambda node: self.base.nodes[node]['level'])
+        self.table_names = np.array(self.by_level, dtype=str)
+        self.table_levels = np.array([self.base.nodes[node]['level'] for node in self.by_level])
+        # 장비별 하위 장비 집합 캐시 (상세 수준 모드의 묶음 개수용, 토폴로지와 함께 버려짐)
+        self._descendants = {}
+        # 읽어 들일 때의 off 장비 집합 (세션별 상태 변경분의 기준)
+        # 중복된 장비 이름은 create_graph_with_status와 같이 마지막 행의 상태 기준
+        if df.empty:
+            self.base_off = frozenset()
+        else:
+            last = df.drop_duplicates('장비 이름', keep='last')
+            self.base_off = frozenset(last.loc[last['상태'] != 'on', '장비 이름'])
+
+    def base_status(self, node):
+        return 'off' if node in self.base_off else 'on'
+
+    def descendants(self, node):
+        found = self._descendants.get(node)
+        if found is None:
+            found = self._descendants[node] = frozenset(nx.descendants(self.base, node))
+        return found
+
+    # 세션별 상태 변경분을 얹은 읽기 전용 뷰
+    def view(self, overrides):
+        return TopologyView(self, overrides)
+
+    # 경로에 포함된 주장비 수 (주장비 우선 정렬, 경로 정보 출력에 공통 사용)
+    def score_path(self, path):
+        primary = self.primary
+        return sum(primary.get(node, 0) for node in path)
+
+# 공유 토폴로지의 구조 그래프 위에 상태 변경분만 얹은 읽기 전용 뷰
+# 그래프나 데이터프레임을 복사하지 않으므로 세션마다 만들어도 비용이 작음
+class TopologyView:
+    def __init__(self, topology, overrides):
+        self.topology = topology
+        self.version = topology.version
+        self.off = set(topology.base_off)
+        for node, status in overrides.items():
+            if node not in topology.base:
+                continue
+            if status == 'on':
+                self.off.discard(node)
+            else:
+                self.off.add(node)
+        # 화면 표시용: off 장비의 출력 간선 제외 / 경로 탐색용: on 장비만
+        self.graph = nx.subgraph_view(topology.base, filter_edge=self._edge_on)
+        self.active = nx.subgraph_view(topology.base, filter_node=self.is_on)
+
+    def _edge_on(self, parent, child):
+        return parent not in self.off
+
+    def is_on(self, node):
+        return node not in self.off
+
+    def status(self, node):
+        return 'off' if node in self.off else 'on'
+
+    def score_path(self, path):
+        return self.topology.score_path(path)
+
+    def status_key(self):
+        return frozenset(self.off)
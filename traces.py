@@ -0,0 +1,56 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# 이 노드 수를 넘으면 브라우저 렌더링을 WebGL(Scattergl)로 전환
+WEBGL_THRESHOLD = 5000
+
+def use_webgl(node_count):
+    return node_count > WEBGL_THRESHOLD
+
+# (u, v) 간선 목록을 좌표 배열 행 번호의 (E, 2) 정수 배열로 변환
+def edge_index(edges, index):
+    flat = np.fromiter((index[node] for edge in edges for node in edge), dtype=np.intp)
+    return flat.reshape(-1, 2)
+
+# 간선마다 (x0, x1, NaN) 형태로 이어 붙인 좌표 배열을 한 번에 생성
+# hidden: 숨길 간선 마스크 (해당 구간을 NaN으로 채움)
+# patchable: Dash Patch로 원소 단위 수정이 가능하도록 NaN을 None으로 바꾼 리스트로 반환
+def edge_coordinates(array, edges, hidden=None, patchable=False):
+    xs = np.full(len(edges) * 3, np.nan)
+    ys = np.full(len(edges) * 3, np.nan)
+    xs[0::3], ys[0::3] = array[edges[:, 0]].T
+    xs[1::3], ys[1::3] = array[edges[:, 1]].T
+    if hidden is not None and len(edges):
+        hidden = np.repeat(np.asarray(hidden, dtype=bool), 3)
+        xs[hidden] = np.nan
+        ys[hidden] = np.nan
+    if patchable:
+        xs = np.where(np.isnan(xs), None, xs).tolist()
+        ys = np.where(np.isnan(ys), None, ys).tolist()
+    return xs, ys
+
+def node_colors(status):
+    return np.where(np.asarray(status) == 'on', 'blue', 'red')
+
+def edge_trace(array, edges, width=2, color='#888', webgl=False, hidden=None, patchable=False):
+    xs, ys = edge_coordinates(array, edges, hidden=hidden, patchable=patchable)
+    scatter = go.Scattergl if webgl else go.Scatter
+    return scatter(
+        x=xs, y=ys,
+        line=dict(width=width, color=color),
+        hoverinfo='none',
+        mode='lines')
+
+def node_trace(array, text, status, webgl=False, customdata=None, size=10):
+    scatter = go.Scattergl if webgl else go.Scatter
+    return scatter(
+        x=array[:, 0], y=array[:, 1],
+        mode='markers+text',
+        hoverinfo='text',
+        text=text,
+        customdata=customdata,
+        marker=dict(
+            showscale=False,
+            color=node_colors(status).tolist(),
+            size=size,
+            line_width=2))
@@ -1,33 +1,49 @@
 import pandas as pd
 import networkx as nx
 
-def read_excel(excel_path):
+from ingest import stream_register, print_issues
+
+# 장비 목록을 청크 단위로 읽으면서 검증하고 결과를 행 번호와 함께 출력 (없는 부모 장비 등은 그래프 생성 시 제외됨)
+# 읽기 오류(파일 없음, 필수 열 없음 등)는 메시지를 출력한 뒤 호출한 쪽으로 그대로 전달
+def read_register(excel_path):
     try:
-        df = pd.read_excel(excel_path)
-        print("엑셀 파일 읽기 성공")
-        # 데이터 프레임에 "상태" 열 추가 및 초기값 설정
-        if '상태' not in df.columns:
-            df['상태'] = 'on'
-        return df
+        # 읽기 전용 모드로 청크 단위로 읽으면서 검증 ("상태" 열이 없으면 초기값 'on')
+        builder, issues = stream_register(excel_path)
     except Exception as e:
         print(f"엑셀 파일 읽기 오류: {e}")
-        return pd.DataFrame()
+        raise
+    print("엑셀 파일 읽기 성공")
+    print_issues(issues)
+    return builder
+
+def read_excel(excel_path):
+    return read_register(excel_path).frame()
 
-def create_graph_with_status(df):
+def explode_parents(df):
+    # 쉼표로 구분된 '부모 장비' 열을 (부모, 자식) 쌍으로 한 번에 펼침
+    parents = df['부모 장비'].dropna().astype(str).str.split(',').explode().str.strip()
+    return pd.DataFrame({
+        'parent': parents.to_numpy(),
+        'child': df.loc[parents.index, '장비 이름'].to_numpy(),
+    })
+
+# edges: 미리 펼친 (부모, 자식) 간선 (스냅샷의 부모 CSR에서 만든 것, 없으면 '부모 장비' 열을 펼침)
+def create_graph_with_status(df, edges=None):
     G = nx.DiGraph()
-    for index, row in df.iterrows():
-        level = row['레벨']
-        equipment = row['장비 이름']
-        parent_equipments = row['부모 장비']
-        
-        # 노드 추가 시 'level' 속성을 설정
-        G.add_node(equipment, level=level, status=row['상태'])
-        
-        if pd.notna(parent_equipments):
-            for parent_equipment in parent_equipments.split(','):
-                parent_equipment = parent_equipment.strip()
-                # 부모 장비가 데이터프레임에 존재하는지 확인
-                if not df[df['장비 이름'] == parent_equipment].empty:
-                    if df[df['장비 이름'] == parent_equipment]['상태'].values[0] == 'on':
-                        G.add_edge(parent_equipment, equipment)
+    if df.empty:
+        return G
+
+    # 노드 추가 시 'level' 속성을 설정 (중복된 장비 이름은 마지막 행의 속성이 남음)
+    G.add_nodes_from(
+        (equipment, {'level': level, 'status': status})
+        for equipment, level, status in zip(df['장비 이름'].tolist(), df['레벨'].tolist(), df['상태'].tolist())
+    )
+
+    # 부모 장비의 상태는 같은 이름의 첫 번째 행 기준으로 이름 인덱스에서 조회
+    parent_status = df.drop_duplicates('장비 이름').set_index('장비 이름')['상태']
+    edges = explode_parents(df) if edges is None else edges
+    status = edges['parent'].map(parent_status)
+    # 데이터프레임에 없는 부모 장비는 상태가 NaN이 되어 자연히 제외됨
+    edges = edges[status == 'on']
+    G.add_edges_from(zip(edges['parent'].tolist(), edges['child'].tolist()))
     return G
@@ -0,0 +1,153 @@
+import os
+import time
+
+import networkx as nx
+import plotly.graph_objects as go
+
+from snapshot import load_equipment
+from topology import Topology
+from positions import LayoutCache
+from paths import PathCache, TOP_K, iter_search_paths
+from routing import RouteModel, iter_shortest_routes, parse_nodes, sort_costs
+from reach import ReachabilityIndex
+from profiling import span
+from background import shared_path_cache
+from csr import CSRTopology
+import traces
+import lod
+
+# 탐색 중 진행 상황을 보내는 간격(초)
+PROGRESS_INTERVAL = 0.5
+# 조건 없는 최단 경로 탐색에 쓰는 그래프 저장소: 'networkx'(기본) 또는 'csr'(int32 배열, 장비가 많을 때)
+GRAPH_BACKEND = os.environ.get('PF_GRAPH_BACKEND', 'networkx')
+
+# 장비 목록 하나로 만든 공유 데이터 묶음: 토폴로지와 그 위의 배치/경로/도달 가능성 캐시
+# 콜백은 이 객체 하나만 참조하므로 처음 필요할 때 만들 수 있음
+class Workspace:
+    def __init__(self, excel_path, backend=GRAPH_BACKEND):
+        if backend not in ('networkx', 'csr'):
+            raise ValueError(f'지원하지 않는 그래프 저장소입니다: {backend} (networkx 또는 csr)')
+        self.excel_path = excel_path
+        # 컴파일된 스냅샷이 최신이면 엑셀 파싱 없이 바로 읽음
+        self.df, edges = load_equipment(excel_path, edges=True)
+        # 버전은 원본 엑셀의 내용 해시 -> 워커 프로세스마다 같은 장비 목록이면 같은 버전
+        sha = self.sha256 = self.df.attrs.get('sha256')
+        self.topology = Topology(self.df, sha[:16] if sha else None, edges)
+        # CSR 저장소를 고르면 경로 탐색은 세션별 on 배열만 얹은 CSR 사본에서 (그림/A*는 networkx 그래프)
+        self.csr = CSRTopology.from_dataframe(self.df) if backend == 'csr' else None
+        self.version = self.topology.version
+        self.layout_cache = LayoutCache()
+        # 경로 유무와 통전 부하는 비트셋 색인으로 바로 판정 (처음 조회할 때 만들고, 세션별 off 장비는 바뀐 부분만 덧씌움)
+        self.reachability = ReachabilityIndex(self.topology.base, self.topology.base_off, self.topology.version)
+        # 백그라운드 작업 프로세스에서 탐색한 결과도 찾도록 diskcache에 함께 기록 (없으면 프로세스 안에서만)
+        self.path_cache = PathCache(reachability=self.reachability, shared=shared_path_cache())
+        # 장비 목록의 비용/손실/점검 열과 예비 장비 가산으로 정한 경로 비용 모델
+        self.route_model = RouteModel(self.topology)
+        # 포함/제외 조건이 있을 때 단거리/주장비 우선 정렬에 쓰는 모델 (처음 쓸 때 만듦)
+        self.sort_models = {}
+        # 드롭다운에 올리는 최대 경로 수
+        self.top_k = TOP_K
+
+    # 그림에 쓰이는 배치: 전체 그래프는 공유 캐시, 상세 수준 모드는 보이는 장비만 새로 배치
+    def figure_layout(self, view, lod_level=None, expanded=None):
+        if lod_level is None:
+            self.layout_cache.layout(view.graph, key=self.topology.version)
+            return self.layout_cache
+        positions = LayoutCache()
+        positions.layout(view.graph.subgraph(lod.visible_nodes(self.topology, lod_level, expanded)))
+        return positions
+
+    def build_figure(self, view, lod_level=None, expanded=None):
+        topology = self.topology
+        with span('layout'):
+            positions = self.figure_layout(view, lod_level, expanded)
+
+        # 좌표 배열과 간선 인덱스 배열로 간선/노드 트레이스를 한 번에 생성
+        # 간선은 전체 구조 기준으로 그리고 off 장비의 출력 간선만 숨김 (토글 시 해당 구간만 패치)
+        with span('traces'):
+            if lod_level is None:
+                edges = topology.edges
+                labels = positions.nodes
+                counts = {}
+            else:
+                edges = list(topology.base.subgraph(positions.nodes).edges())
+                counts = lod.aggregate_counts(topology, positions.nodes, view.off)
+                labels = [lod.node_label(node, counts) for node in positions.nodes]
+            webgl = traces.use_webgl(len(positions.nodes))
+            hidden = [parent in view.off for parent, child in edges]
+            edge_trace = traces.edge_trace(
+                positions.array, traces.edge_index(edges, positions.index),
+                webgl=webgl, hidden=hidden, patchable=True)
+            node_status = [view.status(node) for node in positions.nodes]
+            node_trace = traces.node_trace(
+                positions.array, labels, node_status, webgl=webgl, customdata=positions.nodes,
+                size=[16 if node in counts else 10 for node in positions.nodes])
+            # 선택한 경로를 표시할 빈 트레이스 (경로 콜백이 좌표만 패치)
+            path_trace = traces.edge_trace(positions.array, traces.edge_index([], positions.index),
+                                           width=4, color='green', webgl=webgl, patchable=True)
+
+        with span('figure'):
+            return go.Figure(data=[edge_trace, node_trace, path_trace],
+                         layout=go.Layout(
+                            showlegend=False,
+                            hovermode='closest',
+                            margin=dict(b=0, l=0, r=0, t=0),
+                            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False)
+                         ))
+
+    def sort_model(self, sort):
+        model = self.sort_models.get(sort)
+        if model is None:
+            model = self.sort_models.setdefault(sort, RouteModel(self.topology, sort_costs(self.topology, sort)))
+        return model
+
+    # 비용 순 탐색은 장비 비용 기반 A* (K개 최선 경로)
+    # 포함/제외 조건이 있는 최단/주장비 우선 탐색은 장비 수(+주장비 가산) 비용의 A*로 같은 정렬을 유지 (최단 길이 경로만)
+    # 조건 없는 최단/주장비 우선 탐색은 기존 최단 경로 목록 탐색
+    def iter_path_search(self, view, start, end, must_include, must_avoid, sort):
+        if sort == 'cost':
+            routes = self.route_model.iter_routes(view.active, start, end, TOP_K, must_include, must_avoid)
+            yield from self._collect(routes)
+            return
+        if must_include or must_avoid:
+            routes = iter_shortest_routes(self.sort_model(sort), view.active, start, end, TOP_K, must_include, must_avoid)
+            for scanned, sorted_paths, _ in self._collect(routes):
+                yield scanned, sorted_paths, None
+            return
+        G = self.csr.with_off(view.off) if self.csr is not None else view.active
+        for scanned, sorted_paths in iter_search_paths(G, start, end, sort=sort, score=view.score_path,
+                                                       interval=PROGRESS_INTERVAL):
+            yield scanned, sorted_paths, None
+
+    # (비용, 경로)를 비용 순으로 모으면서 주기적으로 (찾은 경로 수, 경로, 비용)을 내보냄
+    def _collect(self, routes):
+        found = []
+        deadline = time.monotonic() + PROGRESS_INTERVAL
+        for cost, path in routes:
+            found.append((path, cost))
+            if time.monotonic() >= deadline:
+                yield len(found), [path for path, _ in found], [cost for _, cost in found]
+                deadline = time.monotonic() + PROGRESS_INTERVAL
+        yield len(found), [path for path, _ in found], [cost for _, cost in found]
+
+    # 캐시에 없으면 경로를 탐색하면서 주기적으로 progress(살펴본 경로 수, 부분 결과, 비용)를 호출
+    # 반환: (경로 목록, 경로별 비용 또는 None) / 경로가 없으면 빈 목록
+    def search(self, view, path_query, progress=None):
+        start, end, sort = path_query['start'], path_query['end'], path_query['sort']
+        must_include = parse_nodes(path_query['must_include'])
+        must_avoid = parse_nodes(path_query.get('must_avoid'))
+        path_cache = self.path_cache
+        cached = path_cache.get(view, start, end, must_include, sort, must_avoid)
+        if cached is None:
+            sorted_paths, costs = [], None
+            if path_cache.feasible(view, start, end, must_include):
+                try:
+                    for scanned, sorted_paths, costs in self.iter_path_search(view, start, end, must_include, must_avoid, sort):
+                        if progress is not None:
+                            progress(scanned, sorted_paths, costs)
+                except nx.NetworkXNoPath:
+                    sorted_paths, costs = [], None
+            cached = (sorted_paths, costs)
+            path_cache.store(view, start, end, cached, must_include, sort, must_avoid)
+        return cached